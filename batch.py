@@ -0,0 +1,113 @@
+import sys
+import json
+import math
+import argparse
+
+from solve import init_state, is_solvable, check_algorithm, solve, make_solve_result, run_profiled, optimal_algorithms
+from collect import collect_results
+from solution_cache import default_path, open_cache, save_cache, store_solution, cached_result
+
+# Batch solver. Reads one puzzle per line as JSON, either a flat list of tiles or an object
+#   {"id": ..., "board": [...], "n": 3, "algorithm": "A*", "heuristic": "Manhattan Distance"}
+# where every key but "board" is optional, and writes one JSON result per line as each puzzle
+# is solved. Lines that cannot be read are answered with status "invalid" and an "error".
+
+# Parses one input line into (id, initial_state, n, algorithm, heuristic), raising ValueError if it is malformed
+def parse_puzzle(line, line_number, args):
+    request = json.loads(line)
+    if isinstance(request, list):
+        request = {"board": request}
+    if not isinstance(request, dict) or "board" not in request:
+        raise ValueError("Each line must be a list of tiles or an object with a \"board\".")
+    board = request["board"]
+    if board and isinstance(board[0], list):
+        board = [tile for row in board for tile in row]
+    n = request.get("n") or math.isqrt(len(board))
+    algorithm = request.get("algorithm", args.algorithm)
+    heuristic = check_algorithm(algorithm, request.get("heuristic", args.heuristic))
+    return request.get("id", line_number), init_state(board, n), n, algorithm, heuristic
+
+# Writes one JSON result line and flushes it so readers see it straight away
+def write_result(output, puzzle_id, solve_result):
+    output.write(json.dumps({"id": puzzle_id, **solve_result}) + "\n")
+    output.flush()
+
+# Turns input lines into collect_results jobs, answering invalid, unsolvable and cached puzzles directly
+def read_jobs(lines, args, output, cache=None):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            puzzle_id, initial_state, n, algorithm, heuristic = parse_puzzle(line, line_number, args)
+        except (ValueError, TypeError) as e:
+            write_result(output, line_number, {"status": "invalid", "error": str(e)})
+            continue
+        if n != args.n:
+            write_result(output, puzzle_id, {"status": "invalid", "error": f"All puzzles in a parallel batch must be {args.n}x{args.n}."})
+        elif not is_solvable([tile for row in initial_state[0] for tile in row], n):
+            write_result(output, puzzle_id, make_solve_result(initial_state, n, algorithm, heuristic, 0, None, "unsolvable"))
+        elif cache is not None and algorithm in optimal_algorithms and cached_result(cache, initial_state, n):
+            result = cached_result(cache, initial_state, n)
+            write_result(output, puzzle_id, make_solve_result(initial_state, n, algorithm, heuristic, 0, result, cached=True))
+        else:
+            yield (puzzle_id, initial_state, algorithm, heuristic, None)
+
+# Solves every line in order in this process
+def run_sequential(lines, args, output, cache=None):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            puzzle_id, initial_state, n, algorithm, heuristic = parse_puzzle(line, line_number, args)
+            board = [tile for row in initial_state[0] for tile in row]
+        except (ValueError, TypeError) as e:
+            write_result(output, line_number, {"status": "invalid", "error": str(e)})
+            continue
+        write_result(output, puzzle_id, solve(board, n, algorithm, heuristic, cache=cache))
+
+# Solves the lines on worker processes with per-puzzle limits, writing results as they finish
+def run_parallel(lines, args, output, cache=None):
+    jobs = read_jobs(lines, args, output, cache)
+    for job, status, time_taken, result, stats in collect_results(jobs, args.n, args.workers, args.time_limit, args.memory_limit):
+        puzzle_id, initial_state, algorithm, heuristic, optimal = job
+        solve_result = make_solve_result(initial_state, args.n, algorithm, heuristic, time_taken, result, status)
+        if cache is not None and algorithm in optimal_algorithms and solve_result["moves"] is not None:
+            store_solution(cache, solve_result["board"], args.n, solve_result["moves"])
+        write_result(output, puzzle_id, solve_result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve n-puzzles from JSON lines and write JSON line results.")
+    parser.add_argument("input", nargs="?", help="file with one puzzle per line (default: standard input)")
+    parser.add_argument("-o", "--output", help="file to write results to (default: standard output)")
+    parser.add_argument("-a", "--algorithm", default="A*", help="algorithm for lines that do not name one (default: A*)")
+    parser.add_argument("--heuristic", default="Manhattan Distance", help="heuristic for lines that do not name one")
+    parser.add_argument("-n", type=int, default=3, help="puzzle size when running on worker processes (default: 3)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--time-limit", type=float, help="seconds allowed per puzzle")
+    parser.add_argument("--memory-limit", type=int, help="MB of memory allowed per puzzle")
+    parser.add_argument("--cache", nargs="?", const=default_path, metavar="FILE",
+                        help="answer puzzles on earlier optimal solutions from a solution cache and add new ones to it (default file: pdb/solutions.json)")
+    parser.add_argument("--cache-size", type=int, default=10000, help="most solutions to keep in the cache (default: 10000)")
+    parser.add_argument("--profile", metavar="FILE", help="profile the run with cProfile and save it to FILE (without workers or limits only)")
+    args = parser.parse_args()
+    if args.profile and (args.workers > 1 or args.time_limit or args.memory_limit):
+        parser.error("--profile only works when puzzles are solved in this process, without workers or limits.")
+
+    lines = open(args.input) if args.input else sys.stdin
+    output = open(args.output, "w") if args.output else sys.stdout
+    cache = open_cache(args.cache, args.cache_size) if args.cache else None
+    try:
+        if args.workers > 1 or args.time_limit or args.memory_limit:
+            run_parallel(lines, args, output, cache)
+        elif args.profile:
+            run_profiled(args.profile, run_sequential, lines, args, output, cache)
+        else:
+            run_sequential(lines, args, output, cache)
+    finally:
+        if cache is not None:
+            save_cache(cache)
+        if args.input:
+            lines.close()
+        if args.output:
+            output.close()
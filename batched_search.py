@@ -0,0 +1,370 @@
+import sys
+import time
+import argparse
+
+from solve import (init_state, directions, get_goal_board, get_move_table, packed_result, start_counters,
+                   save_stats, manhattan_distance, linear_conflict_distance, a_star_packed)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only the batched searches need NumPy
+
+# Batched searches on NumPy arrays. Instead of expanding one node at a time, K nodes are taken
+# from the frontier together as a (K, n*n) array of boards, all their children are made with a
+# few index shuffles and scored with one vectorized heuristic call, so the interpreter overhead
+# is paid per batch rather than per node. This pays off on 4x4 and 5x5 boards, where the
+# frontier is large; on 3x3 the plain searches are just as fast.
+
+# Batch heuristics already set up in this process, keyed by (heuristic name, n)
+batch_heuristics = {}
+
+# Raises an ImportError with install instructions when NumPy is missing
+def check_numpy():
+    if np is None:
+        raise ImportError("The batched searches need NumPy. Install it with \"pip install numpy\".")
+
+# Returns an (n*n, 4) array of the cell the blank moves to for each blank cell and direction, -1 if it cannot
+def get_move_targets(n):
+    targets = np.full((n * n, len(directions)), -1, dtype=np.int64)
+    for blank, moves in enumerate(get_move_table(n)):
+        for direction, target in moves:
+            targets[blank, directions.index(direction)] = target
+    return targets
+
+# Returns a function scoring a (K, n*n) array of boards with Manhattan Distance
+def make_batch_manhattan(n):
+    size = n * n
+    # distances[tile, cell]: moves for tile from cell to its goal cell, 0 for the blank
+    distances = np.zeros((size, size), dtype=np.int32)
+    for tile in range(1, size):
+        goal_row, goal_column = divmod(tile - 1, n)
+        for cell in range(size):
+            row, column = divmod(cell, n)
+            distances[tile, cell] = abs(row - goal_row) + abs(column - goal_column)
+    cells = np.arange(size)
+
+    def score(boards):
+        return distances[boards, cells].sum(axis=1)
+
+    return score
+
+# Returns a function scoring a (K, n*n) array of boards with Linear Conflict. A line's conflicts
+# depend only on its tiles, so they are looked up by the goal coordinates of the tiles that belong
+# in the line (0 for any other tile) written as a number in base n + 1
+def make_batch_linear_conflict(n):
+    from solve import count_line_conflicts
+    size = n * n
+    manhattan = make_batch_manhattan(n)
+    base = n + 1
+    conflicts = np.zeros(base ** n, dtype=np.int32)
+    for index in range(base ** n):
+        digits = [index // base ** (n - 1 - i) % base for i in range(n)]
+        conflicts[index] = count_line_conflicts([digit for digit in digits if digit])
+    powers = base ** np.arange(n - 1, -1, -1)
+    # row_digits[tile, r] is the tile's goal column + 1 if its goal row is r, otherwise 0, and the
+    # other way round for column_digits
+    row_digits = np.zeros((size, n), dtype=np.int64)
+    column_digits = np.zeros((size, n), dtype=np.int64)
+    for tile in range(1, size):
+        goal_row, goal_column = divmod(tile - 1, n)
+        row_digits[tile, goal_row] = goal_column + 1
+        column_digits[tile, goal_column] = goal_row + 1
+    lines = np.arange(n)[:, None]
+
+    def score(boards):
+        grid = boards.reshape(-1, n, n)
+        rows = conflicts[row_digits[grid, lines] @ powers].sum(axis=1)
+        columns = conflicts[column_digits[grid.transpose(0, 2, 1), lines] @ powers].sum(axis=1)
+        return manhattan(boards) + 2 * (rows + columns)
+
+    return score
+
+# Returns a function scoring a (K, n*n) array of boards with the default pattern databases of
+# pattern_db.py, ranking the cells of every pattern for the whole batch at once
+def make_batch_pattern_database(n):
+    from pattern_db import load_pattern_databases
+    size = n * n
+    tables = [(pattern, np.frombuffer(table, dtype=np.uint8)) for pattern, table in load_pattern_databases(n)]
+
+    def score(boards):
+        cell_of = np.empty_like(boards, dtype=np.int64)
+        cell_of[np.arange(len(boards))[:, None], boards] = np.arange(size)
+        total = np.zeros(len(boards), dtype=np.int32)
+        for pattern, table in tables:
+            cells = cell_of[:, pattern]
+            rank = np.zeros(len(boards), dtype=np.int64)
+            for i in range(len(pattern)):
+                smaller = (cells[:, :i] < cells[:, i:i + 1]).sum(axis=1)
+                rank = rank * (size - i) + cells[:, i] - smaller
+            total += table[rank]
+        return total
+
+    return score
+
+# Returns the batch version of a heuristic: Manhattan Distance, Linear Conflict or Pattern Database.
+# Heuristics are matched by name, because solve.py run as a script has its own copies of them
+def get_batch_heuristic(heuristic, n):
+    makers = {
+        "manhattan_distance": make_batch_manhattan,
+        "linear_conflict_distance": make_batch_linear_conflict,
+        "pattern_database_distance": make_batch_pattern_database
+    }
+    name = getattr(heuristic, "__name__", None)
+    if name not in makers:
+        raise ValueError("The batched searches support Manhattan Distance, Linear Conflict and Pattern Database.")
+    if (name, n) not in batch_heuristics:
+        batch_heuristics[(name, n)] = makers[name](n)
+    return batch_heuristics[(name, n)]
+
+# Makes every child of a batch of boards, skipping the move straight back to previous (the blank
+# of each board's parent, -1 for none). Returns (children, parent rows, direction indexes, child
+# blanks)
+def expand_boards(boards, blanks, previous, move_targets):
+    targets = move_targets[blanks]
+    rows, moves = np.nonzero((targets >= 0) & (targets != previous[:, None]))
+    child_blanks = targets[rows, moves]
+    children = boards[rows]
+    index = np.arange(len(rows))
+    children[index, blanks[rows]] = children[index, child_blanks]
+    children[index, child_blanks] = 0
+    return children, rows, moves, child_blanks
+
+# Scores a batch of boards and counts the work in counters
+def score_boards(score, boards, counters):
+    start = time.perf_counter()
+    h = score(boards)
+    counters["heuristic_calls"] += len(boards)
+    counters["heuristic_time"] += time.perf_counter() - start
+    return h
+
+# Batched A*. Up to batch_size open nodes with the lowest f are expanded together, so some nodes
+# with an f above the optimal one may be expanded; the search stops once the best goal found is
+# no longer than the lowest f left on the open list, so the solution is still optimal. Duplicates
+# are dropped as they are generated, and a board reached again with a lower cost replaces its
+# old node. Returns (state, path, total_moves) like a_star, or None. Needs NumPy
+def batched_a_star(init_state, heuristic, n, batch_size=256, stats=None, callback=None, callback_every=1):
+    check_numpy()
+    score = get_batch_heuristic(heuristic, n)
+    size = n * n
+    move_targets = get_move_targets(n)
+    goal_key = bytes(tile for row in get_goal_board(n) for tile in row)
+    counters = start_counters(stats, callback)[0]
+    infinity = float('inf')
+
+    # Nodes live in growing arrays, indexed by node id
+    capacity = 1024
+    boards = np.empty((capacity, size), dtype=np.uint8)
+    costs = np.empty(capacity, dtype=np.int64)
+    blanks = np.empty(capacity, dtype=np.int64)
+    previous = np.empty(capacity, dtype=np.int64)  # Blank of the parent, so the move straight back is skipped
+    parents = np.empty(capacity, dtype=np.int64)
+    moves = np.empty(capacity, dtype=np.int64)
+    alive = np.empty(capacity, dtype=bool)  # False once a cheaper node for the same board was made
+
+    start = np.array([tile for row in init_state[0] for tile in row], dtype=np.uint8)
+    boards[0], costs[0], blanks[0], previous[0], parents[0], moves[0], alive[0] = start, 0, int(np.argmin(start)), -1, -1, -1, True
+    node_count = 1
+    best = {start.tobytes(): (0, 0)}  # Board -> (lowest cost, node id)
+    h = int(score_boards(score, start[None, :], counters)[0])
+    buckets = {h: [np.array([0])]}  # f -> stacks of node id arrays, newest (deepest) last
+    open_size = counters["pushes"] = counters["max_frontier"] = 1
+    goal_cost, goal_node = (0, 0) if start.tobytes() == goal_key else (infinity, None)
+    total_moves = 0
+    reported = 0
+
+    while buckets and min(buckets) < goal_cost:
+        # Takes up to batch_size live nodes with the lowest f below the best goal found so far
+        taken = []
+        count = 0
+        while buckets and count < batch_size:
+            f = min(buckets)
+            if f >= goal_cost:
+                break
+            chunks = buckets[f]
+            chunk = chunks.pop()
+            if not chunks:
+                del buckets[f]
+            open_size -= len(chunk)
+            total_moves += len(chunk)
+            live = chunk[alive[chunk]]
+            counters["duplicates"] += len(chunk) - len(live)
+            if len(live) > batch_size - count:
+                rest = live[batch_size - count:]
+                buckets.setdefault(f, []).append(rest)
+                open_size += len(rest)
+                total_moves -= len(rest)
+                live = live[:batch_size - count]
+            taken.append(live)
+            count += len(live)
+        if not count:
+            continue
+        ids = np.concatenate(taken)
+        counters["expanded"] += len(ids)
+
+        children, rows, child_moves, child_blanks = expand_boards(boards[ids], blanks[ids], previous[ids], move_targets)
+        counters["generated"] += len(rows)
+        child_costs = costs[ids][rows] + 1
+
+        # Drops the children whose board already has a node at least as cheap
+        data = children.tobytes()
+        kept = []
+        dead = []
+        for i, cost in enumerate(child_costs.tolist()):
+            key = data[i * size:(i + 1) * size]
+            old = best.get(key)
+            if old is not None:
+                if old[0] <= cost:
+                    continue
+                dead.append(old[1])
+            best[key] = (cost, node_count + len(kept))
+            if key == goal_key and cost < goal_cost:
+                goal_cost, goal_node = cost, node_count + len(kept)
+            kept.append(i)
+        counters["duplicates"] += len(rows) - len(kept)
+        if not kept:
+            alive[dead] = False
+            continue
+
+        kept = np.array(kept)
+        new_count = node_count + len(kept)
+        if new_count > capacity:
+            while new_count > capacity:
+                capacity *= 2
+            boards = np.resize(boards, (capacity, size))
+            costs, blanks, previous, parents, moves, alive = (np.resize(array, capacity) for array in (costs, blanks, previous, parents, moves, alive))
+        new_ids = np.arange(node_count, new_count)
+        boards[new_ids] = children[kept]
+        costs[new_ids] = child_costs[kept]
+        blanks[new_ids] = child_blanks[kept]
+        previous[new_ids] = blanks[ids][rows[kept]]
+        parents[new_ids] = ids[rows[kept]]
+        moves[new_ids] = child_moves[kept]
+        alive[new_ids] = True
+        alive[dead] = False  # Also children replaced by a cheaper one from this batch
+        node_count = new_count
+
+        # Scores the new nodes in one call and puts them on the open list by f
+        f_values = costs[new_ids] + score_boards(score, boards[new_ids], counters)
+        order = np.argsort(f_values, kind="stable")
+        values, starts = np.unique(f_values[order], return_index=True)
+        for f, group in zip(values.tolist(), np.split(new_ids[order], starts[1:])):
+            buckets.setdefault(f, []).append(group)
+        open_size += len(new_ids)
+        counters["pushes"] += len(new_ids)
+        counters["max_frontier"] = max(counters["max_frontier"], open_size)
+        if callback and counters["expanded"] // callback_every > reported:
+            reported = counters["expanded"] // callback_every
+            callback(dict(counters, visited=len(best)))
+
+    save_stats(stats, counters, len(best))
+    if goal_node is None:
+        return None
+    packed_path = []
+    node = goal_node
+    while parents[node] >= 0:
+        packed_path.append((directions[moves[node]], int(blanks[node])))
+        node = parents[node]
+    packed_path.reverse()
+    return packed_result(init_state, packed_path, total_moves, n)
+
+# Batched beam search. Each layer keeps only the beam_width children with the lowest heuristic,
+# never returning to a board seen in an earlier layer, so memory stays at about beam_width boards
+# per layer. Solutions are usually longer than the shortest ones. Returns (state, path,
+# total_moves) or None if the beam runs out or max_depth layers pass without reaching the goal.
+# Needs NumPy
+def batched_beam_search(init_state, heuristic, n, beam_width=1000, max_depth=1000, stats=None, callback=None, callback_every=1):
+    check_numpy()
+    score = get_batch_heuristic(heuristic, n)
+    size = n * n
+    move_targets = get_move_targets(n)
+    goal_key = bytes(tile for row in get_goal_board(n) for tile in row)
+    counters = start_counters(stats, callback)[0]
+
+    start = np.array([tile for row in init_state[0] for tile in row], dtype=np.uint8)
+    boards = start[None, :]
+    blanks = np.array([int(np.argmin(start))])
+    previous = np.array([-1])
+    seen = {start.tobytes()}
+    layers = []  # (parent rows, directions, blanks) of every layer, to rebuild the path
+    counters["pushes"] = counters["max_frontier"] = 1
+    total_moves = 0
+    reported = 0
+    goal_row = 0 if start.tobytes() == goal_key else None
+
+    while goal_row is None and len(boards) and len(layers) < max_depth:
+        counters["expanded"] += len(boards)
+        total_moves += len(boards)
+        children, rows, child_moves, child_blanks = expand_boards(boards, blanks, previous, move_targets)
+        counters["generated"] += len(rows)
+
+        # Keeps the first child for every board not seen before
+        data = children.tobytes()
+        kept = []
+        for i in range(len(rows)):
+            key = data[i * size:(i + 1) * size]
+            if key not in seen:
+                seen.add(key)
+                kept.append(i)
+                if key == goal_key:
+                    goal_row = len(kept) - 1
+        counters["duplicates"] += len(rows) - len(kept)
+        kept = np.array(kept, dtype=np.int64)
+        children, rows, child_moves, child_blanks = children[kept], rows[kept], child_moves[kept], child_blanks[kept]
+
+        if goal_row is None and len(children) > beam_width:
+            best = np.argpartition(score_boards(score, children, counters), beam_width)[:beam_width]
+            children, rows, child_moves, child_blanks = children[best], rows[best], child_moves[best], child_blanks[best]
+        layers.append((rows, child_moves, child_blanks))
+        previous = blanks[rows]
+        boards, blanks = children, child_blanks
+        counters["pushes"] += len(boards)
+        counters["max_frontier"] = max(counters["max_frontier"], len(boards))
+        if callback and counters["expanded"] // callback_every > reported:
+            reported = counters["expanded"] // callback_every
+            callback(dict(counters, visited=len(seen)))
+
+    save_stats(stats, counters, len(seen))
+    if goal_row is None:
+        return None
+    packed_path = []
+    row = goal_row
+    for rows, child_moves, child_blanks in reversed(layers):
+        packed_path.append((directions[child_moves[row]], int(child_blanks[row])))
+        row = rows[row]
+    packed_path.reverse()
+    return packed_result(init_state, packed_path, total_moves, n)
+
+
+# Throughput report, e.g. "python batched_search.py --scramble 80" for scrambled 4x4 and 5x5
+# boards, comparing a_star_packed with batched A* and beam search
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the batched NumPy searches with the one-node-at-a-time A*.")
+    parser.add_argument("--heuristic", default="Linear Conflict", choices=["Manhattan Distance", "Linear Conflict"], help="heuristic (default: Linear Conflict)")
+    parser.add_argument("--boards", type=int, default=2, help="boards of each size (default: 2)")
+    parser.add_argument("--scramble", type=int, default=60, help="random moves from the goal for each board (default: 60)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the boards (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=256, help="nodes expanded together by batched A* (default: 256)")
+    parser.add_argument("--beam-width", type=int, default=1000, help="boards kept per layer by beam search (default: 1000)")
+    args = parser.parse_args()
+    check_numpy()
+    from generator import generate_boards
+    heuristic = {"Manhattan Distance": manhattan_distance, "Linear Conflict": linear_conflict_distance}[args.heuristic]
+
+    searches = [
+        ("A*", lambda state, n, stats: a_star_packed(state, heuristic, n, stats)),
+        ("Batched A*", lambda state, n, stats: batched_a_star(state, heuristic, n, args.batch_size, stats)),
+        ("Beam Search", lambda state, n, stats: batched_beam_search(state, heuristic, n, args.beam_width, stats=stats))
+    ]
+    print(f"{'Board':>6} {'Search':>12} {'Seconds':>9} {'Moves':>6} {'Expanded':>10} {'Expanded/s':>11}")
+    for n in (4, 5):
+        for board in generate_boards(args.boards, n, args.seed, scramble=args.scramble):
+            state = init_state(board, n)
+            for name, search in searches:
+                stats = {}
+                start_time = time.perf_counter()
+                result = search(state, n, stats)
+                seconds = time.perf_counter() - start_time
+                moves = len(result[1]) if result else None
+                print(f"{n}x{n}".rjust(6), f"{name:>12} {seconds:>9.3f} {moves!s:>6} {stats['expanded']:>10} {stats['expanded'] / seconds:>11.0f}")
+            sys.stdout.flush()
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import random
+import argparse
+
+from solve import init_state, get_algorithms
+from generator import boards_at_depth
+from collect import collect_results
+
+# Reproducible benchmark suite. A fixed corpus of seeded 3x3 and 4x4 boards, grouped by optimal
+# solution depth, is solved by every algorithm/heuristic pair. Each run happens in a fresh child
+# process so its peak memory can be measured, and the results can be saved as a baseline that
+# later runs are compared against.
+
+# Target optimal depths and number of boards per depth for each size
+corpus_settings = {3: ((8, 16, 24), 3), 4: ((10, 20, 30), 2)}
+default_seed = 2024
+default_corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_corpus.json")
+
+# Builds the corpus from the seed: a list of {"n", "depth", "board"} entries
+def build_corpus(seed=default_seed, settings=corpus_settings):
+    rng = random.Random(seed)
+    corpus = []
+    for n, (depths, count) in sorted(settings.items()):
+        for depth in depths:
+            print(f"Finding {count} {n}x{n} boards at depth {depth}...")
+            for board in boards_at_depth(n, depth, count, rng):
+                corpus.append({"n": n, "depth": depth, "board": board})
+    return corpus
+
+# Loads the corpus file, building and saving it first if it is missing
+def load_corpus(filename=default_corpus, seed=default_seed):
+    if not os.path.isfile(filename):
+        with open(filename, "w") as file:
+            json.dump({"seed": seed, "settings": {str(n): settings for n, settings in corpus_settings.items()}, "boards": build_corpus(seed)}, file, indent=1)
+    with open(filename) as file:
+        return json.load(file)["boards"]
+
+# Runs one benchmark in a child process through collect_results, which enforces the time limit,
+# and returns its measurements
+def measure(board, n, algo_name, heuristic_name, time_limit):
+    job = (None, init_state(board, n), algo_name, heuristic_name, None)
+    for job, status, time_taken, result, stats in collect_results([job], n, 1, time_limit):
+        if status == "timed out":
+            return {"status": status, "time": time_limit}
+        if status:
+            return {"status": status}
+        return {
+            "status": "solved" if result else "no solution",
+            "time": time_taken,
+            "total_moves": result[2] if result else None,
+            "path_moves": len(result[1]) if result else None,
+            "expansions_per_second": stats["expanded"] / time_taken if time_taken > 0 else None,
+            **stats
+        }
+
+# Runs every algorithm/heuristic pair on every corpus board. Each run is repeated `repeat`
+# times and the fastest is kept
+def run_suite(corpus, time_limit=10, repeat=1, sizes=None, algorithms=None):
+    results = []
+    for entry in corpus:
+        n, depth, board = entry["n"], entry["depth"], entry["board"]
+        if sizes and n not in sizes:
+            continue
+        for algo_name, algo_func, algo_heuristics in get_algorithms(include_dfs=True):
+            if algorithms and algo_name not in algorithms:
+                continue
+            for heuristic_name in (algo_heuristics or [None]):
+                runs = [measure(board, n, algo_name, heuristic_name, time_limit) for i in range(repeat)]
+                best = min(runs, key=lambda run: run.get("time") or float("inf"))
+                best.update(n=n, depth=depth, board=board, algorithm=algo_name, heuristic=heuristic_name)
+                results.append(best)
+                print(f"{n}x{n} depth {depth} {algo_name}{' with ' + heuristic_name if heuristic_name else ''}: "
+                      f"{best['status']} in {best.get('time', 0):.4f}s, {best.get('expanded')} expanded, "
+                      f"{best.get('max_frontier')} max frontier, {best.get('peak_rss_mb') or 0:.1f} MB")
+    return results
+
+# Totals the results per (size, depth, algorithm, heuristic)
+def summarize(results):
+    summary = {}
+    for result in results:
+        key = f"{result['n']}x{result['n']} depth {result['depth']} {result['algorithm']} {result['heuristic'] or ''}".strip()
+        group = summary.setdefault(key, {"time": 0, "expanded": 0, "peak_rss_mb": 0, "unsolved": 0})
+        if result["status"] == "solved":
+            group["time"] += result["time"]
+            group["expanded"] += result["expanded"] or 0
+            group["peak_rss_mb"] = max(group["peak_rss_mb"], result["peak_rss_mb"] or 0)
+        else:
+            group["unsolved"] += 1
+    return summary
+
+# Compares a run with a baseline and returns the list of regression messages. Time and memory
+# regress when they grow by more than `threshold` (and time by more than 10 ms); a change in the
+# number of expanded states means the search itself behaves differently and is always reported
+def compare(results, baseline, threshold=0.25):
+    current, previous = summarize(results), summarize(baseline)
+    regressions = []
+    for key, old in previous.items():
+        new = current.get(key)
+        if new is None:
+            continue
+        if new["unsolved"] > old["unsolved"]:
+            regressions.append(f"{key}: {new['unsolved'] - old['unsolved']} more runs unsolved")
+        if new["time"] > old["time"] * (1 + threshold) and new["time"] - old["time"] > 0.01:
+            regressions.append(f"{key}: time {old['time']:.4f}s -> {new['time']:.4f}s")
+        if new["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{key}: peak memory {old['peak_rss_mb']:.1f} MB -> {new['peak_rss_mb']:.1f} MB")
+        if new["expanded"] != old["expanded"] and not new["unsolved"] and not old["unsolved"]:
+            regressions.append(f"{key}: expanded states {old['expanded']} -> {new['expanded']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every algorithm and heuristic on a fixed corpus.")
+    parser.add_argument("--corpus", default=default_corpus, help="corpus file, built from the fixed seed if missing")
+    parser.add_argument("--sizes", type=int, nargs="+", help="only benchmark these sizes, e.g. --sizes 3")
+    parser.add_argument("--algorithms", nargs="+", help="only benchmark these algorithms, e.g. --algorithms A* IDA*")
+    parser.add_argument("--time-limit", type=float, default=10, help="seconds allowed per run (default: 10)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per measurement, the fastest is kept (default: 1)")
+    parser.add_argument("--output", default="benchmark_results.json", help="file to save this run's results to")
+    parser.add_argument("--save-baseline", metavar="FILE", help="also save this run as the baseline in FILE")
+    parser.add_argument("--compare", metavar="FILE", help="compare this run with the baseline in FILE")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a regression is flagged (default: 0.25)")
+    args = parser.parse_args()
+
+    results = run_suite(load_corpus(args.corpus), args.time_limit, args.repeat, args.sizes, args.algorithms)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=1)
+    print(f"Results saved to {args.output}.")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=1)
+        print(f"Baseline saved to {args.save_baseline}.")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}.")
@@ -0,0 +1,221 @@
+import os
+import sys
+import csv
+import json
+import time
+import struct
+import multiprocessing
+from multiprocessing.connection import wait
+
+from solve import init_state, get_algorithms, get_optimal_length, run_algorithm, make_result_row
+from generator import generate_boards
+
+try:
+    import resource  # Memory limits and peak memory are only available on Unix
+except ImportError:
+    resource = None
+
+# Parallel automated data collection. Every (puzzle, algorithm, heuristic) run is a job that
+# gets its own child process, so a run that goes over its time or memory budget can be killed
+# and recorded without holding up the rest of the batch.
+
+# Builds the (key, initial_state, algorithm, heuristic, optimal) jobs for one puzzle. The key
+# identifies the job in the checkpoint file: (seed, puzzle number, puzzle, algorithm, heuristic)
+def make_jobs(initial_state, n, seed=None, puzzle_number=None):
+    optimal = get_optimal_length(initial_state, n)
+    jobs = []
+    for algo_name, algo_func, algo_heuristics in get_algorithms():
+        for heuristic_name in (algo_heuristics or [None]):
+            key = (str(seed), str(puzzle_number), str(initial_state[0]), algo_name, heuristic_name or "")
+            jobs.append((key, initial_state, algo_name, heuristic_name, optimal))
+    return jobs
+
+# Peak resident memory of this process in MB
+def get_peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# Runs one job in a child process and sends (status, time taken, result, stats) back to the
+# parent. stats holds the search counters and the process's peak_rss_mb
+def run_job(connection, job, n, memory_limit):
+    key, initial_state, algo_name, heuristic_name, optimal = job
+    if memory_limit and resource:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start_time = time.perf_counter()
+    out_of_memory = False
+    stats = {}
+    try:
+        time_taken, result = run_algorithm(initial_state, n, algo_name, heuristic_name, stats)
+    except MemoryError:
+        out_of_memory = True
+    # Reported outside the except block so the search frames held by the traceback are freed first
+    if out_of_memory:
+        connection.send(("out of memory", time.perf_counter() - start_time, None, None))
+    else:
+        connection.send((None, time_taken, result, dict(stats, peak_rss_mb=get_peak_rss())))
+    connection.close()
+
+# Runs the jobs on up to `workers` processes and yields (job, status, time taken, result, stats)
+# for each one in the order they finish. Jobs are pulled from the iterable only when a worker is
+# free. Status is None for a finished search, whose stats are those sent by run_job; runs over
+# time_limit seconds are killed and reported as "timed out", runs over memory_limit MB as "out
+# of memory", and runs whose process dies as "failed", all with stats None.
+def collect_results(jobs, n, workers=None, time_limit=None, memory_limit=None):
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    pending = True
+    running = {}  # Result pipe -> (process, job, start time)
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                job = next(jobs, None)
+                if job is None:
+                    pending = False
+                    break
+                reader, writer = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=run_job, args=(writer, job, n, memory_limit), daemon=True)
+                process.start()
+                writer.close()
+                running[reader] = (process, job, time.perf_counter())
+
+            if not running:
+                break
+            timeout = None
+            if time_limit:
+                timeout = max(0, min(start + time_limit for process, job, start in running.values()) - time.perf_counter())
+            for reader in wait(list(running), timeout):
+                process, job, start = running.pop(reader)
+                try:
+                    status, time_taken, result, stats = reader.recv()
+                except EOFError:
+                    status, time_taken, result, stats = "failed", time.perf_counter() - start, None, None
+                reader.close()
+                process.join()
+                yield job, status, time_taken, result, stats
+
+            if time_limit:
+                now = time.perf_counter()
+                for reader, (process, job, start) in list(running.items()):
+                    if now - start >= time_limit:
+                        process.terminate()
+                        process.join()
+                        reader.close()
+                        del running[reader]
+                        yield job, "timed out", now - start, None, None
+    finally:
+        # Stop any runs still going if the caller stops early
+        for reader, (process, job, start) in running.items():
+            process.terminate()
+            process.join()
+            reader.close()
+
+# Column names of PuzzleData.csv
+csv_header = ["Puzzle", "Algorithm", "Heuristic", "Time (seconds)", "Total Moves", "Path Moves", "Optimal Moves", "Status"]
+
+# Statuses a run can end with, stored by index in the binary format
+statuses = ["solved", "no solution", "timed out", "out of memory", "failed"]
+
+# Reads the keys of the jobs already finished by earlier runs
+def load_checkpoint(checkpoint_filename):
+    if not os.path.isfile(checkpoint_filename):
+        return set()
+    with open(checkpoint_filename, newline='') as file:
+        return {tuple(line) for line in csv.reader(file, delimiter='\t')}
+
+# Opens a results file for appending and writes the CSV header if the file is new. A file with
+# other columns, e.g. from an older version, is refused rather than mixed with rows of this layout
+def open_results_csv(filename):
+    file_exists = os.path.isfile(filename) and os.path.getsize(filename) > 0
+    if file_exists:
+        with open(filename, newline='') as file:
+            existing = next(csv.reader(file), None)
+        if existing != csv_header:
+            raise ValueError(f"{filename} has different columns than this version writes. Move or rename it to start a new file.")
+    file = open(filename, mode='a', newline='')
+    writer = csv.writer(file)
+    if not file_exists:
+        writer.writerow(csv_header)
+    return file, writer
+
+# Compact binary results: a JSON header line naming n and the algorithm/heuristic/status codes,
+# followed by fixed-size little-endian records of
+# board (n*n bytes), algorithm, heuristic, status (bytes), time (double), total moves (int64),
+# path moves (int32) and optimal moves (int16). Missing numbers are stored as -1.
+def get_binary_record(n):
+    return struct.Struct(f"<{n * n}sBBBdqih")
+
+# Opens a binary results file for appending, writing the header if the file is new
+def open_results_binary(filename, n):
+    algorithms = [algo_name for algo_name, algo_func, algo_heuristics in get_algorithms()]
+    heuristics = sorted({name for algo_name, algo_func, algo_heuristics in get_algorithms() for name in (algo_heuristics or [])})
+    header = {"n": n, "algorithms": algorithms, "heuristics": [None] + heuristics, "statuses": statuses}
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as file:
+            existing = json.loads(file.readline())
+        if existing != header:
+            raise ValueError(f"{filename} was written for a different puzzle size or algorithm list.")
+    else:
+        with open(filename, 'wb') as file:
+            file.write(json.dumps(header).encode() + b"\n")
+    return open(filename, 'ab'), header
+
+# Appends one result row to an open binary results file
+def write_binary_row(file, header, row):
+    start_state, algo, heuristic, time_taken, total_moves, num_moves, optimal, status = row
+    board = bytes(tile for board_row in start_state for tile in board_row)
+    file.write(get_binary_record(header["n"]).pack(
+        board, header["algorithms"].index(algo), header["heuristics"].index(heuristic), header["statuses"].index(status),
+        time_taken, -1 if total_moves is None else total_moves, -1 if num_moves is None else num_moves, -1 if optimal is None else optimal))
+
+# Reads a binary results file back as the same rows that go into PuzzleData.csv
+def read_binary_results(filename):
+    with open(filename, 'rb') as file:
+        header = json.loads(file.readline())
+        n = header["n"]
+        record = get_binary_record(n)
+        while True:
+            data = file.read(record.size)
+            if len(data) < record.size:
+                break
+            board, algo, heuristic, status, time_taken, total_moves, num_moves, optimal = record.unpack(data)
+            start_state = tuple(tuple(board[i:i + n]) for i in range(0, n * n, n))
+            yield (start_state, header["algorithms"][algo], header["heuristics"][heuristic], time_taken,
+                   None if total_moves < 0 else total_moves, None if num_moves < 0 else num_moves,
+                   None if optimal < 0 else optimal, header["statuses"][status])
+
+# Generates num_states seeded puzzles, runs every job not already in the checkpoint, and writes
+# and flushes each row to the CSV (and binary) file as soon as the run finishes. Yields each row
+# so the caller can show progress. Rerunning with the same seed resumes where it stopped.
+def run_data_collection(num_states, n, seed, workers=None, time_limit=None, memory_limit=None,
+                        filename="PuzzleData.csv", binary_filename=None, checkpoint_filename=None):
+    checkpoint_filename = checkpoint_filename or filename + ".checkpoint"
+    done = load_checkpoint(checkpoint_filename)
+    jobs = []
+    for puzzle_number, board in enumerate(generate_boards(num_states, n, seed), 1):
+        jobs.extend(job for job in make_jobs(init_state(board, n), n, seed, puzzle_number) if job[0] not in done)
+
+    csv_file, writer = open_results_csv(filename)
+    binary_file, header = open_results_binary(binary_filename, n) if binary_filename else (None, None)
+    try:
+        with open(checkpoint_filename, 'a', newline='') as checkpoint_file:
+            checkpoint = csv.writer(checkpoint_file, delimiter='\t')
+            for job, status, time_taken, result, stats in collect_results(jobs, n, workers, time_limit, memory_limit):
+                key, initial_state, algo_name, heuristic_name, optimal = job
+                row = make_result_row(initial_state, algo_name, heuristic_name, time_taken, result, optimal, status)
+                writer.writerow(row)
+                csv_file.flush()
+                if binary_file:
+                    write_binary_row(binary_file, header, row)
+                    binary_file.flush()
+                # The job only counts as done once its row is on disk
+                checkpoint.writerow(job[0])
+                checkpoint_file.flush()
+                yield row
+    finally:
+        csv_file.close()
+        if binary_file:
+            binary_file.close()
@@ -0,0 +1,108 @@
+import sys
+import json
+import random
+import argparse
+
+from solve import is_solvable, get_goal_board, get_goal_positions, get_move_table, ida_star, linear_conflict_distance
+
+# Seeded puzzle generation. Boards are flat lists of tiles, the format init_state() and
+# batch.py take. Every function draws from the rng it is given (a random.Random, or the random
+# module itself), so the same seed always gives the same boards.
+
+# Returns a uniformly random solvable board. Half of all shuffles are unsolvable; swapping two
+# tiles flips the inversion parity without moving the blank, which makes them solvable
+def random_board(n, rng=random):
+    board = list(range(n * n))
+    rng.shuffle(board)
+    if not is_solvable(board, n):
+        first, second = [index for index, tile in enumerate(board) if tile != 0][:2]
+        board[first], board[second] = board[second], board[first]
+    return board
+
+# Returns the board reached by `length` random moves from the goal, never moving the blank
+# straight back. The optimal solution is at most `length` moves
+def scrambled_board(n, length, rng=random):
+    board = [tile for row in get_goal_board(n) for tile in row]
+    move_table = get_move_table(n)
+    blank, previous = n * n - 1, -1
+    for step in range(length):
+        target = rng.choice([target for direction, target in move_table[blank] if target != previous])
+        board[blank], board[target] = board[target], 0
+        blank, previous = target, blank
+    return board
+
+# Optimal solution length of a flat board, from the 3x3 oracle or IDA* with linear conflict
+def optimal_depth(board, n):
+    if n == 3:
+        from oracle import optimal_length
+        return optimal_length(board)
+    state = (tuple(tuple(board[i:i + n]) for i in range(0, n * n, n)), -1, -1)
+    return len(ida_star(state, linear_conflict_distance, n)[1])
+
+# Returns `count` distinct boards whose optimal solution is exactly `depth` moves. Random walks from
+# the goal are checked once they are long enough and have the right parity; boards whose linear
+# conflict bound is over the depth (or far under it) are skipped before the exact check. Raises
+# ValueError when max_misses walks in a row find no new board, e.g. because fewer than `count`
+# boards exist at that depth or it is past the hardest board of the size
+def boards_at_depth(n, depth, count, rng=random, max_misses=1000):
+    if depth < 1:
+        raise ValueError("The depth must be at least 1.")
+    goal_positions = get_goal_positions(n)
+    move_table = get_move_table(n)
+    goal = [tile for row in get_goal_board(n) for tile in row]
+    boards = []
+    misses = 0
+    while len(boards) < count:
+        if misses == max_misses:
+            raise ValueError(f"Found only {len(boards)} of {count} boards at depth {depth} for {n}x{n} after {max_misses} walks without a new one.")
+        misses += 1
+        board = list(goal)
+        blank, previous = n * n - 1, -1
+        for steps in range(1, 3 * depth + 1):
+            target = rng.choice([target for direction, target in move_table[blank] if target != previous])
+            board[blank], board[target] = board[target], 0
+            blank, previous = target, blank
+            if steps < depth or (steps - depth) % 2:
+                continue
+            state = (tuple(tuple(board[i:i + n]) for i in range(0, n * n, n)), -1, -1)
+            bound = linear_conflict_distance(state, goal_positions, n)
+            if depth - 6 <= bound <= depth and board not in boards and optimal_depth(board, n) == depth:
+                boards.append(list(board))
+                misses = 0
+                break
+    return boards
+
+# Yields `count` boards from a seed: uniformly random and solvable by default, `scramble` random
+# moves from the goal, or exactly `depth` optimal moves from the goal
+def generate_boards(count, n, seed=None, depth=None, scramble=None):
+    rng = random.Random(seed)
+    if depth is not None:
+        yield from boards_at_depth(n, depth, count, rng)
+        return
+    for i in range(count):
+        yield scrambled_board(n, scramble, rng) if scramble is not None else random_board(n, rng)
+
+
+# Writes boards as JSON lines, ready for batch.py, e.g. "python generator.py 4 --count 100 --depth 30 --seed 1"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate seeded solvable n-puzzle boards as JSON lines.")
+    parser.add_argument("n", type=int, help="size of the puzzle, e.g. 3 for 3x3")
+    parser.add_argument("--count", type=int, default=1, help="number of boards (default: 1)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible boards")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--depth", type=int, help="exact optimal solution length of every board")
+    group.add_argument("--scramble", type=int, help="number of random moves from the goal")
+    parser.add_argument("-o", "--output", help="file to write the boards to (default: standard output)")
+    args = parser.parse_args()
+    if args.n < 2:
+        parser.error("n must be at least 2.")
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for board in generate_boards(args.count, args.n, args.seed, args.depth, args.scramble):
+            output.write(json.dumps(board) + "\n")
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if args.output:
+            output.close()
@@ -0,0 +1,90 @@
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+from generator import generate_boards
+from server import line_limit
+
+# Load generator for server.py. Opens `clients` connections, each keeping up to `pipeline`
+# requests in flight, sends seeded random boards until `requests` have been answered, and reports
+# the throughput, the latency percentiles of the answers and how many got each status.
+
+# Value below which `fraction` of the sorted values fall
+def percentile(values, fraction):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+# One client connection: sends boards from the shared iterator and records (status, latency) for each answer
+async def run_client(host, port, boards, pipeline, request, answers):
+    reader, writer = await asyncio.open_connection(host, port, limit=line_limit)
+    sent = {}  # Request id -> time sent
+    next_id = 0
+
+    def send_next():
+        nonlocal next_id
+        board = next(boards, None)
+        if board is None:
+            return False
+        next_id += 1
+        sent[next_id] = time.perf_counter()
+        writer.write((json.dumps(dict(request, id=next_id, board=board)) + "\n").encode())
+        return True
+
+    try:
+        while len(sent) < pipeline and send_next():
+            pass
+        await writer.drain()
+        while sent:
+            line = await reader.readline()
+            if not line:
+                break  # The server closed the connection
+            result = json.loads(line)
+            answers.append((result["status"], time.perf_counter() - sent.pop(result["id"])))
+            send_next()
+            await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+# Runs the load and returns (seconds, [(status, latency)])
+async def run_load(host, port, boards, clients, pipeline, request):
+    boards = iter(boards)
+    answers = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, boards, pipeline, request, answers) for i in range(clients)))
+    return time.perf_counter() - start_time, answers
+
+
+# Measures the server, e.g. "python load_client.py --requests 500 --clients 8 --algorithm IDA* --heuristic "Linear Conflict""
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the throughput and latency of server.py.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="server port (default: 8765)")
+    parser.add_argument("--requests", type=int, default=200, help="number of puzzles to send (default: 200)")
+    parser.add_argument("--clients", type=int, default=4, help="number of connections (default: 4)")
+    parser.add_argument("--pipeline", type=int, default=1, help="requests each connection keeps in flight (default: 1)")
+    parser.add_argument("-n", type=int, default=3, help="puzzle size (default: 3)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the boards (default: 1)")
+    parser.add_argument("--scramble", type=int, help="random moves from the goal for each board (default: uniformly random boards)")
+    parser.add_argument("-a", "--algorithm", help="algorithm to ask for (default: the server's)")
+    parser.add_argument("--heuristic", help="heuristic to ask for (default: the server's)")
+    parser.add_argument("--deadline", type=float, help="seconds allowed for each request (default: the server's)")
+    args = parser.parse_args()
+
+    request = {"n": args.n}
+    for key in ("algorithm", "heuristic", "deadline"):
+        if getattr(args, key) is not None:
+            request[key] = getattr(args, key)
+    boards = generate_boards(args.requests, args.n, args.seed, scramble=args.scramble)
+    seconds, answers = asyncio.run(run_load(args.host, args.port, boards, args.clients, args.pipeline, request))
+
+    latencies = sorted(latency for status, latency in answers)
+    print(f"{len(answers)} answers in {seconds:.3f} seconds, {len(answers) / seconds:.1f} per second")
+    if latencies:
+        print("Latency (ms): " + ", ".join(f"{name} {percentile(latencies, fraction) * 1000:.1f}"
+                                          for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))))
+    for status, count in Counter(status for status, latency in answers).most_common():
+        print(f"  {status}: {count}")
@@ -0,0 +1,118 @@
+import os
+import sys
+import mmap
+from collections import deque
+from math import factorial
+
+from solve import directions, init_state, move, get_goal_board
+
+# Perfect-information oracle for the 3x3 puzzle. Every one of the 9! permutations is indexed by
+# its Lehmer rank and the table stores its optimal distance to the goal (255 if unsolvable).
+
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb", "oracle_3x3.bin")
+
+# Memory-mapped table, opened on first use
+loaded_table = None
+
+# Ranks a flat permutation of 0..8 from 0 to 9! - 1
+def rank_permutation(tiles):
+    rank = 0
+    for i, tile in enumerate(tiles):
+        smaller = 0
+        for later in tiles[i + 1:]:
+            if later < tile:
+                smaller += 1
+        rank += smaller * factorial(len(tiles) - 1 - i)
+    return rank
+
+# Flattens a tuple-of-tuples board, leaves a flat list or tuple as it is
+def flatten_board(board):
+    if isinstance(board[0], (tuple, list)):
+        return [tile for row in board for tile in row]
+    return list(board)
+
+# Breadth-first search backwards from the goal over all 181,440 solvable boards
+def build_oracle():
+    table = bytearray([255]) * factorial(9)
+    goal = tuple(flatten_board(get_goal_board(3)))
+    table[rank_permutation(goal)] = 0
+    queue = deque([(goal, goal.index(0))])
+    while queue:
+        tiles, blank = queue.popleft()
+        distance = table[rank_permutation(tiles)] + 1
+        i, j = divmod(blank, 3)
+        for target in (blank - 3 if i > 0 else -1, blank + 3 if i < 2 else -1, blank - 1 if j > 0 else -1, blank + 1 if j < 2 else -1):
+            if target < 0:
+                continue
+            new_tiles = list(tiles)
+            new_tiles[blank], new_tiles[target] = new_tiles[target], 0
+            rank = rank_permutation(new_tiles)
+            if table[rank] == 255:
+                table[rank] = distance
+                queue.append((tuple(new_tiles), target))
+    return table
+
+# Builds and saves the table if the file is missing
+def save_oracle(path=default_path):
+    if not os.path.isfile(path):
+        print("Building the 3x3 distance table. This only happens once...", file=sys.stderr)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = build_oracle()
+        with open(path + ".tmp", "wb") as file:
+            file.write(table)
+        os.replace(path + ".tmp", path)
+
+# Memory-maps the table, building it first if needed
+def load_oracle(path=default_path):
+    global loaded_table
+    if loaded_table is None:
+        save_oracle(path)
+        with open(path, "rb") as file:
+            loaded_table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return loaded_table
+
+# Returns the optimal number of moves for a 3x3 board, or None if it is unsolvable
+def optimal_length(board):
+    tiles = flatten_board(board)
+    if len(tiles) != 9:
+        raise ValueError("The oracle only covers 3x3 boards.")
+    distance = load_oracle()[rank_permutation(tiles)]
+    return None if distance == 255 else distance
+
+# Returns an optimal (direction, state) path by always stepping to a neighbor one move closer
+def optimal_path(state):
+    distance = optimal_length(state[0])
+    if distance is None:
+        return None
+    path = []
+    while distance > 0:
+        for direction in directions:
+            neighbor = move(state, direction, 3)
+            if neighbor and optimal_length(neighbor[0]) == distance - 1:
+                path.append((direction, neighbor))
+                state = neighbor
+                distance -= 1
+                break
+    return path
+
+# Calculates the exact distance to the goal, a perfect heuristic for A* on 3x3 boards
+def oracle_distance(state, goal_positions, n):
+    return optimal_length(state[0])
+
+# Solves a 3x3 board with the oracle, returning the same (state, path, total_moves) as the searches
+def oracle_solve(init_state, n):
+    path = optimal_path(init_state)
+    if path is None:
+        return None
+    final_state = path[-1][1] if path else init_state
+    return final_state, path, len(path)
+
+
+# Offline build step, "python oracle.py" or "python oracle.py 2 7 5 0 8 4 3 1 6" to look up one board
+if __name__ == "__main__":
+    save_oracle()
+    if len(sys.argv) > 1:
+        state = init_state([int(x) for x in sys.argv[1:]], 3)
+        print(f"Optimal path moves: {optimal_length(state[0])}")
+    else:
+        print(f"3x3 distance table is ready in {default_path}.")
@@ -0,0 +1,251 @@
+import sys
+import time
+import heapq
+import argparse
+import multiprocessing
+
+from solve import (init_state, get_tile_bits, get_move_table, get_goal_positions, get_goal_board, pack_board,
+                   pack_state, packed_move, unpack_board, packed_result, heuristic_deltas, start_counters,
+                   stat_names, get_heuristics, a_star_packed, direction_offsets)
+
+# Hash-distributed parallel A* (HDA*) for a single hard instance. Every packed state has an owner
+# process picked by a hash of its code, and only the owner keeps its open list entry, its best
+# cost and its parent. The search runs in rounds: each worker takes the nodes sent to it, expands
+# up to round_size of its nodes whose f is no higher than the lowest f of the whole search, and
+# hands back the children owned by other workers, which the coordinator (the calling process)
+# passes on in the next round. Holding every worker to the lowest f keeps the expansions close to
+# those of a_star. Workers do not expand in exactly the same order, so a state can be reached
+# again with a lower cost and is then reopened.
+
+# Owner of a packed state. Taking the code modulo a large prime mixes the bits of every cell
+def get_owner(code, workers):
+    return code % 2147483647 % workers
+
+# Worker process. Messages from the coordinator are ("round", nodes, incumbent, bound), which answers
+# (outgoing nodes per worker, lowest open f, best goal cost, counters, open list size, states
+# seen), ("parent", code), which answers the parent link of a state, and None to stop. A node is
+# (g, h, code, blank, parent code, direction)
+def run_worker(connection, worker_id, workers, heuristic, n, round_size, instrument):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_positions = get_goal_positions(n)
+    positions = [divmod(index, n) for index in range(n * n)]
+    goal_code = pack_board(get_goal_board(n), n)
+    counters, heuristic, delta = start_counters({} if instrument else None, None, heuristic, heuristic_deltas.get(heuristic))
+    infinity = float('inf')
+    costs = {}
+    parents = {}  # code -> (parent code, direction, blank)
+    pq = []
+    goal_cost = infinity
+    total_moves = 0
+
+    # Keeps a node if it reached its state with a lower cost than before
+    def insert(node):
+        nonlocal goal_cost
+        g, h, code, blank, parent, direction = node
+        if g >= costs.get(code, infinity):
+            counters["duplicates"] += 1
+            return
+        costs[code] = g
+        parents[code] = (parent, direction, blank)
+        if code == goal_code:
+            goal_cost = min(goal_cost, g)
+            return
+        # The parent's blank, so the move straight back is not generated
+        previous = blank - direction_offsets[direction][0] * n - direction_offsets[direction][1] if direction else -1
+        heapq.heappush(pq, (g + h, -g, h, code, blank, previous))  # Ties go to the deeper node
+        counters["pushes"] += 1
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        if message[0] == "parent":
+            connection.send(parents.get(message[1]))
+            continue
+
+        kind, nodes, incumbent, bound = message
+        for node in nodes:
+            insert(node)
+        outgoing = [[] for i in range(workers)]
+        expanded = 0
+        while pq and expanded < round_size:
+            f, g, h, code, blank, previous = pq[0]
+            g = -g
+            if g != costs[code]:
+                heapq.heappop(pq)  # Reached again with a lower cost since it was pushed
+                counters["duplicates"] += 1
+                continue
+            if f >= min(incumbent, goal_cost) or f > bound:
+                break  # Nothing left here can lead to a shorter solution, or not yet
+            heapq.heappop(pq)
+            total_moves += 1
+            expanded += 1
+            counters["expanded"] += 1
+            for direction, target in move_table[blank]:
+                if target == previous:
+                    continue
+                neighbor = packed_move(code, blank, target, bits, mask)
+                counters["generated"] += 1
+                if delta:
+                    tile = (code >> (target * bits)) & mask
+                    new_h = h + delta(tile, positions[target], positions[blank], goal_positions, n)
+                else:
+                    new_h = heuristic((unpack_board(neighbor, n), -1, -1), goal_positions, n)
+                node = (g + 1, new_h, neighbor, target, code, direction)
+                owner = get_owner(neighbor, workers)
+                if owner == worker_id:
+                    insert(node)
+                else:
+                    outgoing[owner].append(node)
+        counters["max_frontier"] = max(counters["max_frontier"], len(pq))
+        while pq and -pq[0][1] != costs[pq[0][3]]:
+            heapq.heappop(pq)
+        lowest = pq[0][0] if pq else infinity
+        connection.send((outgoing, lowest, goal_cost, dict(counters, total_moves=total_moves), len(pq), len(costs)))
+    connection.close()
+
+# Parallel A* on `workers` processes. The search stops once the best goal cost found is no higher
+# than the lowest f of every open node and of every node still being passed between workers, so
+# the solution is optimal with an admissible heuristic. Returns (state, path, total_moves) like
+# a_star, or None. stats gets the usual counters summed over the workers ("max_frontier" is the
+# largest total open list after a round), plus "workers", "rounds" and "worker_expanded", the
+# states each worker expanded. The callback gets the summed counters after each round in which
+# another callback_every states were expanded
+def parallel_a_star(init_state, heuristic, n, workers=None, round_size=1000, stats=None, callback=None, callback_every=1):
+    workers = workers or multiprocessing.cpu_count()
+    goal_positions = get_goal_positions(n)
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    infinity = float('inf')
+    instrument = stats is not None or bool(callback)
+
+    connections = []
+    processes = []
+    try:
+        for worker_id in range(workers):
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, args=(child_connection, worker_id, workers, heuristic, n, round_size, instrument), daemon=True)
+            process.start()
+            child_connection.close()
+            connections.append(connection)
+            processes.append(process)
+
+        incoming = [[] for i in range(workers)]
+        h = heuristic(init_state, goal_positions, n)
+        incoming[get_owner(start_code, workers)].append((0, h, start_code, start_blank, None, None))
+        incumbent = infinity
+        lowest = h
+        rounds = 0
+        max_frontier = 0
+        reported = 0
+        while True:
+            for worker_id, connection in enumerate(connections):
+                connection.send(("round", incoming[worker_id], incumbent, lowest))
+            replies = [connection.recv() for connection in connections]
+            rounds += 1
+            incoming = [[node for reply in replies for node in reply[0][worker_id]] for worker_id in range(workers)]
+            incumbent = min([incumbent] + [reply[2] for reply in replies])
+            lowest = min([reply[1] for reply in replies] + [node[0] + node[1] for nodes in incoming for node in nodes])
+            max_frontier = max(max_frontier, sum(reply[4] for reply in replies))
+            counters = {name: sum(reply[3][name] for reply in replies) for name in stat_names}
+            counters.update(max_frontier=max_frontier, visited=sum(reply[5] for reply in replies))
+            if callback and counters["expanded"] // callback_every > reported:
+                reported = counters["expanded"] // callback_every
+                callback(counters)
+            if lowest >= incumbent:
+                break  # Also covers an empty search, where both are infinite
+
+        total_moves = sum(reply[3]["total_moves"] for reply in replies)
+        if stats is not None:
+            stats.update(counters, workers=workers, rounds=rounds, worker_expanded=[reply[3]["expanded"] for reply in replies])
+        if incumbent == infinity:
+            return None
+
+        # Follows the parent links back from the goal, asking the owner of each state
+        packed_path = []
+        code = goal_code
+        while code != start_code:
+            connection = connections[get_owner(code, workers)]
+            connection.send(("parent", code))
+            parent, direction, blank = connection.recv()
+            packed_path.append((direction, blank))
+            code = parent
+        packed_path.reverse()
+        return packed_result(init_state, packed_path, total_moves, n)
+    finally:
+        for connection in connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+# Solves board with a_star_packed and then with 1 and every other worker count, and returns a row
+# for each: (workers, seconds, speedup, efficiency, expanded, search overhead, rounds, path
+# moves). Speedup, efficiency and overhead are measured against the single worker run; workers 0
+# is a_star_packed, for comparison with the plain search
+def scaling_report(board, n, heuristic, worker_counts, round_size=1000):
+    state = init_state(board, n)
+    stats = {}
+    start_time = time.perf_counter()
+    result = a_star_packed(state, heuristic, n, stats)
+    rows = [(0, time.perf_counter() - start_time, None, None, stats["expanded"], None, 0, len(result[1]) if result else None)]
+    base_time = base_expanded = None
+    for workers in [1] + [workers for workers in worker_counts if workers > 1]:
+        stats = {}
+        start_time = time.perf_counter()
+        result = parallel_a_star(state, heuristic, n, workers, round_size, stats)
+        seconds = time.perf_counter() - start_time
+        if base_time is None:
+            base_time, base_expanded = seconds, max(stats["expanded"], 1)
+        speedup = base_time / seconds
+        rows.append((workers, seconds, speedup, speedup / workers, stats["expanded"], stats["expanded"] / base_expanded,
+                     stats["rounds"], len(result[1]) if result else None))
+    return rows
+
+
+# Scaling report, e.g. "python parallel_a_star.py --workers 1 2 4 8" for the hardest 4x4 boards of
+# the benchmark corpus, or "python parallel_a_star.py --board 5 2 8 12 3 7 4 0 6 1 10 14 9 13 15 11"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report how parallel A* scales with the number of worker processes.")
+    parser.add_argument("--board", type=int, nargs="+", help="tiles of one board, 0 for the blank (default: the deepest corpus boards)")
+    parser.add_argument("-n", type=int, default=4, help="puzzle size for the corpus boards (default: 4)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to try (default: 1 2 4)")
+    parser.add_argument("--heuristic", default="Linear Conflict", help="heuristic name (default: Linear Conflict)")
+    parser.add_argument("--round-size", type=int, default=1000, help="expansions per worker per round (default: 1000)")
+    args = parser.parse_args()
+    heuristics = get_heuristics()
+    if args.heuristic not in heuristics:
+        parser.error(f"unknown heuristic {args.heuristic!r}, choose from: {', '.join(heuristics)}")
+
+    if args.board:
+        n = round(len(args.board) ** 0.5)
+        if n * n != len(args.board):
+            parser.error("the board must have a square number of tiles.")
+        boards = [args.board]
+    else:
+        n = args.n
+        from benchmark import load_corpus
+        corpus = [entry for entry in load_corpus() if entry["n"] == n]
+        if not corpus:
+            parser.error(f"the corpus has no {n}x{n} boards.")
+        deepest = max(entry["depth"] for entry in corpus)
+        boards = [entry["board"] for entry in corpus if entry["depth"] == deepest]
+
+    print(f"{multiprocessing.cpu_count()} CPU cores available, heuristic {args.heuristic}")
+    for board in boards:
+        print(f"\nBoard {board}")
+        print(f"{'Workers':>8} {'Seconds':>9} {'Speedup':>8} {'Efficiency':>11} {'Expanded':>10} {'Overhead':>9} {'Rounds':>7} {'Moves':>6}")
+        for workers, seconds, speedup, efficiency, expanded, overhead, rounds, moves in scaling_report(board, n, heuristics[args.heuristic], args.workers, args.round_size):
+            if not workers:
+                print(f"{'A*':>8} {seconds:>9.3f} {'':>8} {'':>11} {expanded:>10} {'':>9} {'':>7} {moves!s:>6}")
+            else:
+                print(f"{workers:>8} {seconds:>9.3f} {speedup:>8.2f} {efficiency:>11.2f} {expanded:>10} {overhead:>9.2f} {rounds:>7} {moves!s:>6}")
+        sys.stdout.flush()
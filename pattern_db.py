@@ -0,0 +1,186 @@
+import os
+import sys
+import mmap
+import argparse
+from math import perm
+
+from solve import get_goal_positions, get_move_table
+
+# Additive disjoint pattern databases. Each pattern is a group of tiles; its table stores, for
+# every placement of those tiles, the fewest moves of pattern tiles needed to bring them home.
+# Moves of other tiles cost nothing, so the tables of disjoint groups can be summed.
+
+# Tile groups used when no partition is given
+default_partitions = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15))
+}
+
+# Named partitions that can be picked on the command line. The build keeps one byte per
+# (placement, empty cell) pair, so 6-tile groups need about 270 MB while building
+named_partitions = {
+    (4, "5-5-5"): default_partitions[4],
+    (4, "6-6-3"): ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))
+}
+
+# Folder the table files are written to and memory-mapped from
+default_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+
+# Memory-mapped tables already opened in this process, keyed by (n, partition, directory)
+loaded_databases = {}
+
+# Default-partition heuristics already set up in this process, keyed by n
+default_heuristics = {}
+
+# Largest size that gets a partition without one being given. Building a group of k tiles keeps
+# (n*n) ** (k + 1) bytes, about 10 MB for 4 tiles on 5x5 but over 1 GB on 8x8
+largest_default_size = 5
+
+# Returns the partition for n, splitting the tiles into groups of 4 in goal order for sizes without a default
+def get_partition(n, name=None):
+    if name is not None:
+        if (n, name) not in named_partitions:
+            raise ValueError(f"Unknown partition {name} for a {n}x{n} board.")
+        return named_partitions[(n, name)]
+    if n in default_partitions:
+        return default_partitions[n]
+    if n > largest_default_size:
+        raise ValueError(f"No default pattern databases for a {n}x{n} board, the largest is {largest_default_size}x{largest_default_size}. Pass a partition of small groups instead.")
+    tiles = list(range(1, n * n))
+    return tuple(tuple(tiles[i:i + 4]) for i in range(0, len(tiles), 4))
+
+# Checks that the groups are disjoint and cover only real tiles
+def check_partition(partition, n):
+    tiles = [tile for pattern in partition for tile in pattern]
+    if len(tiles) != len(set(tiles)) or any(tile not in range(1, n * n) for tile in tiles):
+        raise ValueError(f"Patterns must be disjoint groups of tiles from 1 to {n * n - 1}.")
+
+# Ranks the cells of a pattern as a k-permutation of the n*n cells, from 0 to size!/(size-k)! - 1
+def rank_pattern(cells, size):
+    rank = 0
+    for i, cell in enumerate(cells):
+        smaller = 0
+        for previous in cells[:i]:
+            if previous < cell:
+                smaller += 1
+        rank = rank * (size - i) + cell - smaller
+    return rank
+
+# Name of the file holding the table of one pattern
+def get_table_path(n, pattern, directory):
+    return os.path.join(directory, f"pdb_{n}x{n}_{'-'.join(map(str, pattern))}.bin")
+
+# Builds the table of one pattern with a backward 0-1 breadth-first search from the goal.
+# A search state is the cells of the pattern tiles plus the empty cell; sliding a pattern
+# tile costs 1 and sliding any other tile costs 0.
+def build_pattern_database(n, pattern):
+    size = n * n
+    k = len(pattern)
+    move_table = get_move_table(n)
+    neighbors = [[target for direction, target in move_table[blank]] for blank in range(size)]
+    goal_positions = get_goal_positions(n)
+    weights = [size ** i for i in range(k)]
+
+    # Build states are numbered (sum of cell_i * size**i) * size + empty cell
+    start = sum(weights[i] * (goal_positions[tile][0] * n + goal_positions[tile][1]) for i, tile in enumerate(pattern))
+    seen = bytearray(size ** (k + 1))
+    placed = bytearray(size ** k)
+    table = bytearray([255]) * perm(size, k)
+
+    frontier = [start * size + size - 1]
+    depth = 0
+    while frontier:
+        stack = []
+        for state in frontier:
+            if not seen[state]:
+                seen[state] = 1
+                stack.append(state)
+        next_frontier = []
+        while stack:
+            state = stack.pop()
+            cells_code, blank = divmod(state, size)
+            cells = []
+            code = cells_code
+            for i in range(k):
+                code, cell = divmod(code, size)
+                cells.append(cell)
+            if not placed[cells_code]:
+                placed[cells_code] = 1
+                table[rank_pattern(cells, size)] = depth
+            for target in neighbors[blank]:
+                if target in cells:
+                    new_state = (cells_code + (blank - target) * weights[cells.index(target)]) * size + target
+                    if not seen[new_state]:
+                        next_frontier.append(new_state)
+                else:
+                    new_state = cells_code * size + target
+                    if not seen[new_state]:
+                        seen[new_state] = 1
+                        stack.append(new_state)
+        frontier = next_frontier
+        depth += 1
+    return table
+
+# Builds and saves the tables of every pattern in the partition, skipping files that already exist
+def build_pattern_databases(n, partition=None, directory=default_directory):
+    partition = partition or get_partition(n)
+    check_partition(partition, n)
+    os.makedirs(directory, exist_ok=True)
+    for pattern in partition:
+        path = get_table_path(n, pattern, directory)
+        if os.path.isfile(path):
+            continue
+        print(f"Building pattern database for tiles {pattern}. This only happens once...", file=sys.stderr)
+        table = build_pattern_database(n, pattern)
+        with open(path + ".tmp", "wb") as file:
+            file.write(table)
+        os.replace(path + ".tmp", path)
+
+# Memory-maps the tables of a partition, building any that are missing first
+def load_pattern_databases(n, partition=None, directory=default_directory):
+    partition = tuple(map(tuple, partition or get_partition(n)))
+    key = (n, partition, directory)
+    if key not in loaded_databases:
+        build_pattern_databases(n, partition, directory)
+        databases = []
+        for pattern in partition:
+            with open(get_table_path(n, pattern, directory), "rb") as file:
+                databases.append((pattern, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)))
+        loaded_databases[key] = databases
+    return loaded_databases[key]
+
+# Returns a heuristic with the usual (state, goal_positions, n) signature that sums the tables of a partition
+def make_pattern_database_heuristic(n, partition=None, directory=default_directory):
+    databases = load_pattern_databases(n, partition, directory)
+    size = n * n
+
+    def pattern_database_heuristic(state, goal_positions, n):
+        cell_of = [0] * size
+        index = 0
+        for row in state[0]:
+            for tile in row:
+                cell_of[tile] = index
+                index += 1
+        return sum(table[rank_pattern([cell_of[tile] for tile in pattern], size)] for pattern, table in databases)
+
+    return pattern_database_heuristic
+
+# Calculates Additive Pattern Database Heuristic with the default partition for n
+def pattern_database_distance(state, goal_positions, n):
+    if n not in default_heuristics:
+        default_heuristics[n] = make_pattern_database_heuristic(n)
+    return default_heuristics[n](state, goal_positions, n)
+
+
+# Offline build step, e.g. "python pattern_db.py 4 --partition 6-6-3"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build additive pattern databases for the n-puzzle.")
+    parser.add_argument("n", type=int, help="size of the puzzle, e.g. 4 for 4x4")
+    parser.add_argument("--partition", help="named partition, 5-5-5 or 6-6-3 (4x4 only)")
+    parser.add_argument("--directory", default=default_directory, help="folder for the table files")
+    args = parser.parse_args()
+    try:
+        build_pattern_databases(args.n, get_partition(args.n, args.partition), args.directory)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Pattern databases for {args.n}x{args.n} are ready in {args.directory}.")
@@ -0,0 +1,238 @@
+import time
+import json
+import signal
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from solve import is_solvable, solve, make_solve_result
+from batch import parse_puzzle
+
+# Solve server. Clients connect over TCP and send one JSON request per line, in the format of
+# batch.py plus an optional "deadline" in seconds:
+#   {"id": "p1", "board": [...], "algorithm": "IDA*", "heuristic": "Linear Conflict", "deadline": 5}
+# and get one JSON result per line, in the order the puzzles finish, with the same fields as
+# solve() plus "id" and "queue_time". {"cancel": "p1"} cancels a request that has not been
+# answered yet, and closing the connection cancels all of its requests. Searches run on a pool
+# of worker processes; a worker whose search is cancelled or runs past its deadline is killed
+# and replaced. When more requests are waiting than the queue holds, new ones are answered
+# straight away with status "busy", so clients slow down instead of the server running out of
+# memory. Other statuses are those of solve(), plus "invalid" and "cancelled".
+
+# Largest request or result line, big enough for the path of a large constructive solution
+line_limit = 1 << 24
+
+# Worker process: solves (board, n, algorithm, heuristic) jobs from the connection until it gets None
+def run_worker(connection):
+    # The server's own signal handlers are inherited on fork; it stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        board, n, algorithm, heuristic = job
+        try:
+            result = solve(board, n, algorithm, heuristic)
+        except MemoryError:
+            result = {"status": "out of memory"}
+        connection.send(result)
+    connection.close()
+
+# Starts a worker process and returns [process, connection]
+def start_worker():
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_worker, args=(child_connection,), daemon=True)
+    process.start()
+    child_connection.close()
+    return [process, connection]
+
+# Kills a worker process that is stuck in a search and frees its pipe
+def stop_worker(worker):
+    process, connection = worker
+    process.terminate()
+    process.join(1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    connection.close()
+
+# Writes one JSON result line to a client, ignoring clients that have gone away
+async def send_result(writer, request_id, solve_result):
+    if writer.is_closing():
+        return
+    try:
+        writer.write((json.dumps({"id": request_id, **solve_result}) + "\n").encode())
+        await writer.drain()
+    except ConnectionError:
+        pass
+
+# Answers a job that will not be solved ("cancelled" or "timed out") and stops it from being solved
+async def finish_job(job, status, elapsed=0):
+    request_id, initial_state, n, algorithm, heuristic = job["request"]
+    job["cancelled"].set()
+    if job["pending"].pop(request_id, None) is job:
+        solve_result = make_solve_result(initial_state, n, algorithm, heuristic, elapsed, None, status)
+        queue_time = job["queue_time"] if job["started"] else asyncio.get_running_loop().time() - job["queued"]
+        await send_result(job["writer"], request_id, dict(solve_result, queue_time=queue_time))
+
+# Takes jobs from the queue and solves them on one worker process until the server stops, waiting
+# for its results on a thread of executor, which needs one thread per worker. A job
+# is a dict with the request, its "deadline" (event loop time, or None), a "cancelled" event that
+# is set once the job is answered or given up, whether it has "started", the time it was
+# "queued" and how long it waited ("queue_time"), its deadline "timer" and the client's "writer"
+# and "pending" requests
+async def serve_jobs(queue, worker, executor):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            job = await queue.get()
+            if job["cancelled"].is_set():
+                continue  # Cancelled, timed out or disconnected while waiting, and already answered
+            request_id, initial_state, n, algorithm, heuristic = job["request"]
+            board = [tile for row in initial_state[0] for tile in row]
+            job["queue_time"] = loop.time() - job["queued"]
+            remaining = job["deadline"] - loop.time() if job["deadline"] is not None else None
+            if remaining is not None and remaining <= 0:
+                await finish_job(job, "timed out")
+                continue
+            job["started"] = True
+            start_time = time.time()
+            worker[1].send((board, n, algorithm, heuristic))
+            receive = asyncio.ensure_future(loop.run_in_executor(executor, worker[1].recv))
+            cancel = asyncio.ensure_future(job["cancelled"].wait())
+            done, waiting = await asyncio.wait({receive, cancel}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            cancel.cancel()
+            if job["timer"]:
+                job["timer"].cancel()
+            status = None
+            if receive in done:
+                try:
+                    solve_result = receive.result()
+                except (EOFError, OSError):
+                    status = "failed"  # The worker died, e.g. killed by the system
+            else:
+                status = "cancelled" if cancel in done else "timed out"
+            if status:
+                stop_worker(worker)
+                await asyncio.gather(receive, return_exceptions=True)  # recv fails once the pipe is closed
+                worker[:] = start_worker()
+                await finish_job(job, status, time.time() - start_time)
+            elif job["pending"].pop(request_id, None) is job:
+                job["cancelled"].set()
+                await send_result(job["writer"], request_id, dict(solve_result, queue_time=job["queue_time"]))
+    finally:
+        stop_worker(worker)
+
+# Reads a client's requests, validates them and queues them for the workers
+async def handle_client(reader, writer, queue, args):
+    loop = asyncio.get_running_loop()
+    pending = {}  # Request id -> job, until it is answered
+
+    # Answers a job that is still waiting for a worker once its deadline passes
+    def expire(job):
+        if not job["started"]:
+            asyncio.ensure_future(finish_job(job, "timed out"))
+
+    try:
+        line_number = 0
+        while True:
+            try:
+                line = await reader.readline()
+            except (ConnectionError, ValueError):
+                break  # Reset by the client, or a line over line_limit
+            if not line:
+                break
+            line_number += 1
+            if not line.strip():
+                continue
+            message = None
+            try:
+                message = json.loads(line)
+                if isinstance(message, dict) and "cancel" in message:
+                    job = pending.get(message["cancel"])
+                    if job is None:
+                        raise ValueError(f"No pending request with id {message['cancel']!r}.")
+                    if job["started"]:
+                        job["cancelled"].set()  # Its worker is stopped and answers it
+                    else:
+                        await finish_job(job, "cancelled")
+                    continue
+                request = parse_puzzle(line, line_number, args)
+                hash(request[0])
+                deadline = message.get("deadline", args.deadline) if isinstance(message, dict) else args.deadline
+                if deadline is not None and (not isinstance(deadline, (int, float)) or deadline <= 0):
+                    raise ValueError("The deadline must be a positive number of seconds.")
+            except (ValueError, TypeError, KeyError) as e:
+                request_id = message.get("id", line_number) if isinstance(message, dict) else line_number
+                await send_result(writer, request_id, {"status": "invalid", "error": str(e)})
+                continue
+
+            request_id, initial_state, n, algorithm, heuristic = request
+            if request_id in pending:
+                await send_result(writer, request_id, {"status": "invalid", "error": f"Request id {request_id!r} is already pending."})
+            elif not is_solvable([tile for row in initial_state[0] for tile in row], n):
+                await send_result(writer, request_id, make_solve_result(initial_state, n, algorithm, heuristic, 0, None, "unsolvable"))
+            elif queue.full():
+                await send_result(writer, request_id, {"status": "busy", "error": "Too many requests are waiting, try again later."})
+            else:
+                job = {"request": request, "deadline": loop.time() + deadline if deadline else None, "cancelled": asyncio.Event(),
+                       "started": False, "queued": loop.time(), "queue_time": None, "timer": None, "writer": writer, "pending": pending}
+                if deadline:
+                    job["timer"] = loop.call_later(deadline, expire, job)
+                pending[request_id] = job
+                queue.put_nowait(job)
+    finally:
+        # Gives up the client's requests, stopping any that are being solved
+        for job in list(pending.values()):
+            job["cancelled"].set()
+            if job["timer"]:
+                job["timer"].cancel()
+        pending.clear()
+        writer.close()
+
+# Runs the server until it is interrupted or terminated, then stops the worker processes
+async def run_server(args):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for name in ("SIGINT", "SIGTERM"):
+        try:
+            loop.add_signal_handler(getattr(signal, name), stop.set)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows, where Ctrl+C raises KeyboardInterrupt instead
+    queue = asyncio.Queue(args.queue_size)
+    # Each worker's recv blocks a thread for a whole search, so the default executor (at most 32
+    # threads) would leave the results of some workers unread on large machines
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    workers = [asyncio.create_task(serve_jobs(queue, start_worker(), executor)) for i in range(args.workers)]
+    try:
+        server = await asyncio.start_server(lambda reader, writer: handle_client(reader, writer, queue, args), args.host, args.port, limit=line_limit)
+        print(f"Solving on {args.workers} worker processes at {args.host}:{args.port}, at most {args.queue_size} waiting requests.", flush=True)
+        async with server:
+            await stop.wait()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        executor.shutdown(wait=False)
+
+
+# Local solve server, e.g. "python server.py --port 8765 --workers 4"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve n-puzzle solves over TCP as JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("-w", "--workers", type=int, default=multiprocessing.cpu_count(), help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--queue-size", type=int, default=100, help="most requests waiting for a worker before new ones get \"busy\" (default: 100)")
+    parser.add_argument("--deadline", type=float, help="seconds allowed for requests that do not give a deadline (default: no limit)")
+    parser.add_argument("-a", "--algorithm", default="A*", help="algorithm for requests that do not name one (default: A*)")
+    parser.add_argument("--heuristic", default="Manhattan Distance", help="heuristic for requests that do not name one")
+    args = parser.parse_args()
+    if args.workers < 1 or args.queue_size < 1:
+        parser.error("--workers and --queue-size must be at least 1.")
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
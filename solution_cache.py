@@ -0,0 +1,129 @@
+import os
+import json
+from collections import OrderedDict
+
+from solve import move
+
+# Solution cache shared between queries. It keeps optimal solutions by canonical board: a board
+# and its reflection about the main diagonal, with every tile relabeled to the tile whose goal
+# cell is the reflection of its own, need the same number of moves (up and left swap, as do down
+# and right), so both are stored under whichever of the two flat boards is smaller. Every board
+# on a stored solution is indexed as well, because the rest of an optimal solution is an optimal
+# solution for the board it starts from. The least recently used solutions are dropped once
+# there are more than `capacity`, and the cache can be saved to a JSON file between runs.
+
+# Default file the interactive program and batch.py keep their cache in, next to the pattern databases
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb", "solutions.json")
+
+# Letters used for the moves on disk
+move_letters = {'up': 'U', 'down': 'D', 'right': 'R', 'left': 'L'}
+letter_moves = {letter: direction for direction, letter in move_letters.items()}
+
+# Each move's counterpart on the reflected board
+reflected_moves = {'up': 'left', 'left': 'up', 'down': 'right', 'right': 'down'}
+
+# Returns the reflection of a flat board about the main diagonal with its tiles relabeled
+def reflect_board(tiles, n):
+    reflected = [0] * (n * n)
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, n)
+        if tile:
+            goal_row, goal_column = divmod(tile - 1, n)
+            tile = goal_column * n + goal_row + 1
+        reflected[column * n + row] = tile
+    return reflected
+
+# Returns (key, reflected) for a flat board: the key is (n, canonical tiles) and reflected is True
+# if the canonical board is the reflection of this one
+def canonical_key(tiles, n):
+    tiles = tuple(tiles)
+    reflected = tuple(reflect_board(tiles, n))
+    if reflected < tiles:
+        return (n, reflected), True
+    return (n, tiles), False
+
+# Slides the tile next to the blank of a flat board into it and returns the new board
+def apply_move(tiles, direction, n):
+    blank = tiles.index(0)
+    target = blank + {'up': -n, 'down': n, 'right': 1, 'left': -1}[direction]
+    tiles = list(tiles)
+    tiles[blank], tiles[target] = tiles[target], 0
+    return tiles
+
+# Returns an empty cache holding at most capacity solutions, loaded from path if the file exists.
+# A cache is a dict: "solutions" maps the key of each solved board to its moves, oldest use
+# first, and "positions" maps the key of every board on those solutions to (solved board key,
+# moves already made, reflected)
+def open_cache(path=None, capacity=10000):
+    cache = {"path": path, "capacity": capacity, "solutions": OrderedDict(), "positions": {}}
+    if path and os.path.isfile(path):
+        with open(path) as file:
+            for n, tiles, letters in json.load(file)["solutions"]:
+                store_solution(cache, tiles, n, [letter_moves[letter] for letter in letters])
+    return cache
+
+# Writes the cache to its file, if it has one, oldest use first
+def save_cache(cache):
+    path = cache["path"]
+    if not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    solutions = [[n, list(tiles), "".join(move_letters[direction] for direction in moves)]
+                 for (n, tiles), moves in cache["solutions"].items()]
+    with open(path + ".tmp", "w") as file:
+        json.dump({"solutions": solutions}, file)
+    os.replace(path + ".tmp", path)
+
+# Stores an optimal solution (a list of directions) for a flat board and indexes every board on it
+def store_solution(cache, tiles, n, moves):
+    key, reflected = canonical_key(tiles, n)
+    solutions = cache["solutions"]
+    if key in solutions:
+        solutions.move_to_end(key)
+        return
+    if reflected:
+        moves = [reflected_moves[direction] for direction in moves]
+    solutions[key] = moves
+    positions = cache["positions"]
+    board = list(key[1])
+    for index in range(len(moves) + 1):
+        position_key, position_reflected = canonical_key(board, n)
+        positions[position_key] = (key, index, position_reflected)
+        if index < len(moves):
+            board = apply_move(board, moves[index], n)
+
+    while len(solutions) > cache["capacity"]:
+        evict_key, evict_moves = solutions.popitem(last=False)
+        evict_n, board = evict_key[0], list(evict_key[1])
+        for index in range(len(evict_moves) + 1):
+            position_key = canonical_key(board, evict_n)[0]
+            if positions.get(position_key, (None,))[0] == evict_key:
+                del positions[position_key]
+            if index < len(evict_moves):
+                board = apply_move(board, evict_moves[index], evict_n)
+
+# Returns the optimal moves for a flat board if it is on a cached solution, otherwise None
+def lookup_solution(cache, tiles, n):
+    key, reflected = canonical_key(tiles, n)
+    position = cache["positions"].get(key)
+    if position is None:
+        return None
+    solution_key, index, position_reflected = position
+    cache["solutions"].move_to_end(solution_key)
+    moves = cache["solutions"][solution_key][index:]
+    if reflected != position_reflected:
+        moves = [reflected_moves[direction] for direction in moves]
+    return moves
+
+# Returns a cached solution as the (state, path, total_moves) tuple of the searches, with no
+# moves attempted, or None
+def cached_result(cache, init_state, n):
+    moves = lookup_solution(cache, [tile for row in init_state[0] for tile in row], n)
+    if moves is None:
+        return None
+    state = init_state
+    path = []
+    for direction in moves:
+        state = move(state, direction, n)
+        path.append((direction, state))
+    return state, path, 0
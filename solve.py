@@ -1,12 +1,22 @@
+import math
 import time
 import random
 import heapq
+import itertools
+import bisect
 import csv
 import os
+import cProfile
+import pstats
+from collections import deque
 from sys import exit
 
 directions = ['up', 'down', 'right', 'left']
 
+# Row and column offsets of the empty cell for each direction
+direction_offsets = {'up': (-1, 0), 'down': (1, 0), 'right': (0, 1), 'left': (0, -1)}
+offset_directions = {offset: direction for direction, offset in direction_offsets.items()}
+
 # Creates the board
 def init_state(board_as_array, n):
     # Ensure the length of board_as_array is correct and all values are present
@@ -65,6 +75,105 @@ def move(state, direction, n):
         return new_board, i, j
     return None
 
+# Packed state engine: a board is stored as a single int with a fixed number of bits per tile
+# and a packed state is (code, blank) where blank is the flat index of the empty cell.
+# Move tables are built once per n and cached here.
+move_tables = {}
+
+# Number of bits needed to store one tile of an n x n board
+def get_tile_bits(n):
+    return (n * n - 1).bit_length()
+
+# Packs a tuple-of-tuples board into a single int
+def pack_board(board, n):
+    bits = get_tile_bits(n)
+    code = 0
+    for index, tile in enumerate(tile for row in board for tile in row):
+        code |= tile << (index * bits)
+    return code
+
+# Unpacks an int back into a tuple-of-tuples board
+def unpack_board(code, n):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    flat = [(code >> (index * bits)) & mask for index in range(n * n)]
+    return tuple(tuple(flat[i:i + n]) for i in range(0, n * n, n))
+
+# Converts a regular (board, row, column) state into a packed (code, blank) state
+def pack_state(state, n):
+    board = state[0]
+    i, j = find_empty_cell(board)
+    return pack_board(board, n), i * n + j
+
+# Builds the (direction, target index) moves available from every blank position, once per n
+def get_move_table(n):
+    if n not in move_tables:
+        table = []
+        for blank in range(n * n):
+            i, j = divmod(blank, n)
+            moves = []
+            for direction in directions:
+                di, dj = direction_offsets[direction]
+                if 0 <= i + di < n and 0 <= j + dj < n:
+                    moves.append((direction, (i + di) * n + j + dj))
+            table.append(tuple(moves))
+        move_tables[n] = tuple(table)
+    return move_tables[n]
+
+# Slides the tile at the target index into the blank and returns the new code
+def packed_move(code, blank, target, bits, mask):
+    tile = (code >> (target * bits)) & mask
+    return code - (tile << (target * bits)) + (tile << (blank * bits))
+
+# Rebuilds the regular (direction, state) path from a list of (direction, target index) moves
+def unpack_path(init_state, packed_path, n):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    code, blank = pack_state(init_state, n)
+    path = []
+    for direction, target in packed_path:
+        code = packed_move(code, blank, target, bits, mask)
+        path.append((direction, (unpack_board(code, n), blank // n, blank % n)))
+        blank = target
+    return path
+
+# Finds the flat index of the empty cell in a packed board
+def find_packed_blank(code, n):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    for index in range(n * n):
+        if (code >> (index * bits)) & mask == 0:
+            return index
+    raise ValueError("No empty cell found in the board.")
+
+# Follows packed parent links back from code and returns the (direction, target index) moves that reach it
+def packed_path_from_parents(parents, code, n):
+    codes = []
+    while code is not None:
+        codes.append(code)
+        code = parents[code]
+    codes.reverse()
+    return packed_path_from_codes(codes, n)
+
+# Returns the (direction, target index) moves that walk through a list of consecutive packed codes
+def packed_path_from_codes(codes, n):
+    blanks = [find_packed_blank(code, n) for code in codes]
+    packed_path = []
+    for blank, target in zip(blanks, blanks[1:]):
+        offset = (target // n - blank // n, target % n - blank % n)
+        packed_path.append((offset_directions[offset], target))
+    return packed_path
+
+# Returns the regular (state, path, total_moves) result of a packed search
+def packed_result(init_state, packed_path, total_moves, n):
+    path = unpack_path(init_state, packed_path, n)
+    final_state = path[-1][1] if path else init_state
+    return final_state, path, total_moves
+
+# Returns the goal board where tiles are in sequential order with 0 in the last position
+def get_goal_board(n):
+    return tuple(tuple((i * n + j + 1) % (n * n) for j in range(n)) for i in range(n))
+
 # Compute and store the goal positions for each tile to efficiently calculate heuristic distances
 def get_goal_positions(n):
     return {value: divmod(value - 1, n) for value in range(1, n * n)}
@@ -84,10 +193,7 @@ def manhattan_distance(state, goal_positions, n):
 # Calculates Hamming Distance Heuristic
 def hamming_distance(state, goal_positions, n):
     board = state[0]
-    goal = tuple(tuple((i * n + j + 1) % (n * n) for j in range(n)) for i in range(n))
-    flat_board = [tile for row in board for tile in row]
-    flat_goal = [tile for row in goal for tile in row]
-    return sum(1 for current_tile, goal_tile in zip(flat_board, flat_goal) if current_tile != 0 and current_tile != goal_tile)
+    return sum(1 for i in range(n) for j in range(n) if board[i][j] != 0 and goal_positions[board[i][j]] != (i, j))
 
 # Calculates Euclidean Distance Heuristic
 def euclidean_distance(state, goal_positions, n):
@@ -113,76 +219,340 @@ def chebyshev_distance(state, goal_positions, n):
                 total_distance += max(abs(i - goal_row), abs(j - goal_col))
     return total_distance
 
-# A* algorithm with correct heuristic passed in
-def a_star(init_state, heuristic, n):
-    pq = []
+# Number of tiles that must leave a line so the rest are in goal order (line length minus the
+# longest increasing run of goal coordinates); each of them costs at least two extra moves
+def count_line_conflicts(goal_coords):
+    tails = []
+    for coord in goal_coords:
+        index = bisect.bisect_left(tails, coord)
+        if index == len(tails):
+            tails.append(coord)
+        else:
+            tails[index] = coord
+    return len(goal_coords) - len(tails)
+
+# Linear conflicts of row r of a flat board: tiles whose goal row is r, listed by goal column
+def row_conflicts(tiles, r, goal_positions, n):
+    return count_line_conflicts([goal_positions[tile][1] for tile in tiles[r * n:r * n + n] if tile != 0 and goal_positions[tile][0] == r])
+
+# Linear conflicts of column c of a flat board: tiles whose goal column is c, listed by goal row
+def column_conflicts(tiles, c, goal_positions, n):
+    return count_line_conflicts([goal_positions[tile][0] for tile in tiles[c::n] if tile != 0 and goal_positions[tile][1] == c])
+
+# Calculates Manhattan Distance plus Linear Conflict Heuristic
+def linear_conflict_distance(state, goal_positions, n):
+    tiles = [tile for row in state[0] for tile in row]
+    conflicts = sum(row_conflicts(tiles, r, goal_positions, n) + column_conflicts(tiles, r, goal_positions, n) for r in range(n))
+    return manhattan_distance(state, goal_positions, n) + 2 * conflicts
+
+# Change in Manhattan Distance when a tile slides from from_pos to to_pos
+def manhattan_delta(tile, from_pos, to_pos, goal_positions, n):
+    goal_row, goal_col = goal_positions[tile]
+    return (abs(to_pos[0] - goal_row) + abs(to_pos[1] - goal_col)) - (abs(from_pos[0] - goal_row) + abs(from_pos[1] - goal_col))
+
+# Change in Hamming Distance when a tile slides from from_pos to to_pos
+def hamming_delta(tile, from_pos, to_pos, goal_positions, n):
+    goal_pos = goal_positions[tile]
+    return (to_pos != goal_pos) - (from_pos != goal_pos)
+
+# Change in Euclidean Distance when a tile slides from from_pos to to_pos
+def euclidean_delta(tile, from_pos, to_pos, goal_positions, n):
+    goal_row, goal_col = goal_positions[tile]
+    return ((to_pos[0] - goal_row) ** 2 + (to_pos[1] - goal_col) ** 2) ** 0.5 - ((from_pos[0] - goal_row) ** 2 + (from_pos[1] - goal_col) ** 2) ** 0.5
+
+# Change in Chebyshev Distance when a tile slides from from_pos to to_pos
+def chebyshev_delta(tile, from_pos, to_pos, goal_positions, n):
+    goal_row, goal_col = goal_positions[tile]
+    return max(abs(to_pos[0] - goal_row), abs(to_pos[1] - goal_col)) - max(abs(from_pos[0] - goal_row), abs(from_pos[1] - goal_col))
+
+# Per-move delta of each heuristic. The full function scores the start state and the delta
+# updates the parent's value in O(1); heuristics without an entry are re-evaluated on every state
+heuristic_deltas = {
+    manhattan_distance: manhattan_delta,
+    hamming_distance: hamming_delta,
+    euclidean_distance: euclidean_delta,
+    chebyshev_distance: chebyshev_delta
+}
+
+# Returns the (start, step) pair of a heuristic that needs more than the moved tile to update, or
+# None. start(tiles, n) returns (h, key) for a flat board and step(key, tile, blank, target, n)
+# returns the (h, key) after the tile at target slides into the blank. IDA* and both A* searches
+# carry the key with every state; the other searches call the heuristic itself. Heuristics are
+# matched by name, because solve.py run as a script has its own copies of them
+def get_incremental_heuristic(heuristic):
+    if getattr(heuristic, "__name__", None) == "walking_distance":
+        from walking_distance import start_walking_distance, step_walking_distance
+        return start_walking_distance, step_walking_distance
+    return None
+
+# Follows parent links back from state to rebuild the (direction, state) path that reaches it
+def reconstruct_path(parents, state):
+    path = []
+    parent, direction = parents[state]
+    while parent is not None:
+        path.append((direction, state))
+        state = parent
+        parent, direction = parents[state]
+    path.reverse()
+    return path
+
+# Open list for the A* searches, returned as push(f, g, entry), pop() -> (f, g, entry) and
+# size() functions. pop() takes the lowest f and, among equal f, the highest g. Every move costs
+# 1, so with integer heuristics every f gets a bucket of stacks indexed by g and both take O(1);
+# other heuristics (Euclidean Distance) fall back to a heap. Entries are never compared
+def make_open_list(integer_costs):
+    if not integer_costs:
+        heap = []
+        heappush, heappop = heapq.heappush, heapq.heappop
+        numbers = itertools.count().__next__  # Breaks ties between equal (f, g) before the entries
+
+        def push(f, g, entry):
+            heappush(heap, (f, -g, numbers(), entry))
+
+        def pop():
+            f, g, number, entry = heappop(heap)
+            return f, -g, entry
+
+        return push, pop, heap.__len__
+
+    buckets = {}  # f -> stacks of entries indexed by g, with no empty stacks at the end
+    lowest = float('inf')  # Lowest f with a bucket
+    size = 0
+
+    def push(f, g, entry):
+        nonlocal lowest, size
+        stacks = buckets.get(f)
+        if stacks is None:
+            stacks = buckets[f] = []
+            if f < lowest:
+                lowest = f
+        while len(stacks) <= g:
+            stacks.append([])
+        stacks[g].append(entry)
+        size += 1
+
+    def pop():
+        nonlocal lowest, size
+        f = lowest
+        stacks = buckets[f]
+        g = len(stacks) - 1
+        entry = stacks[g].pop()
+        size -= 1
+        while stacks and not stacks[-1]:
+            stacks.pop()
+        if not stacks:
+            del buckets[f]
+            if size:
+                while lowest not in buckets:
+                    lowest += 1
+            else:
+                lowest = float('inf')
+        return f, g, entry
+
+    return push, pop, lambda: size
+
+# Counters every search fills in the caller's stats dict, the same way for every algorithm:
+#   expanded         states whose children were generated
+#   generated        children created by a legal move
+#   duplicates       children and popped entries dropped because their state was already seen
+#                    (for IDA*, moves straight back to the previous empty cell)
+#   pushes           entries added to the open list (recursive calls for the depth-first searches)
+#   max_frontier     largest open list (deepest path for the depth-first searches)
+#   visited          states held in the visited set (longest path for the depth-first searches)
+#   heuristic_calls  heuristic evaluations, full or incremental
+#   heuristic_time   seconds spent in those evaluations
+# total_moves in the returned tuple keeps its old per-algorithm meaning.
+stat_names = ("expanded", "generated", "duplicates", "pushes", "max_frontier", "visited", "heuristic_calls", "heuristic_time")
+
+# Wraps a heuristic (or delta) function so every call is counted and timed in counters
+def count_calls(func, counters):
+    if func is None:
+        return None
+
+    def counted(*args):
+        counters["heuristic_calls"] += 1
+        start = time.perf_counter()
+        value = func(*args)
+        counters["heuristic_time"] += time.perf_counter() - start
+        return value
+
+    return counted
+
+# Sets up a search's counters. Heuristic calls are only wrapped for counting when stats or a
+# callback was asked for, so uninstrumented searches run at full speed
+def start_counters(stats, callback, heuristic=None, delta=None):
+    counters = dict.fromkeys(stat_names, 0)
+    counters["heuristic_time"] = 0.0
+    if stats is not None or callback:
+        heuristic, delta = count_calls(heuristic, counters), count_calls(delta, counters)
+    return counters, heuristic, delta
+
+# Calls the progress callback with a copy of the counters every callback_every expansions
+def report_progress(callback, callback_every, counters, visited):
+    if counters["expanded"] % callback_every == 0:
+        callback(dict(counters, visited=visited))
+
+# Copies a search's counters into the caller's stats dict, if one was passed
+def save_stats(stats, counters, visited):
+    if stats is not None:
+        stats.update(counters, visited=visited)
+
+# Runs func(*args, **kwargs) under cProfile and returns its result. The profile is written to
+# filename (open it with pstats or snakeviz), or its 20 most expensive calls are printed
+def run_profiled(filename, func, *args, **kwargs):
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        if filename:
+            profiler.dump_stats(filename)
+        else:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+# A* algorithm with correct heuristic passed in. The optional callback(counters) is called
+# every callback_every expansions. With a node_budget the memory-bounded sma_star is used instead,
+# and with a time_limit the anytime_a_star that returns the best solution found in time. With
+# workers the search is spread over that many processes by parallel_a_star
+def a_star(init_state, heuristic, n, packed=False, stats=None, callback=None, callback_every=1, node_budget=None, time_limit=None, workers=None):
+    if workers:
+        from parallel_a_star import parallel_a_star
+        return parallel_a_star(init_state, heuristic, n, workers, stats=stats, callback=callback, callback_every=callback_every)
+    if time_limit:
+        return anytime_a_star(init_state, heuristic, n, time_limit, stats=stats, callback=callback, callback_every=callback_every)
+    if node_budget:
+        return sma_star(init_state, heuristic, n, node_budget, stats, callback, callback_every)
+    if packed:
+        return a_star_packed(init_state, heuristic, n, stats, callback, callback_every)
     goal_positions = get_goal_positions(n)
-    heapq.heappush(pq, (heuristic(init_state, goal_positions, n), 0, init_state, []))
-    visited = set()
+    incremental = get_incremental_heuristic(heuristic)
+    # With an incremental heuristic, delta is its step function
+    counters, heuristic, delta = start_counters(stats, callback, heuristic, incremental[1] if incremental else heuristic_deltas.get(heuristic))
+    h = heuristic(init_state, goal_positions, n)
+    key = incremental[0]([tile for row in init_state[0] for tile in row], n)[1] if incremental else None
+    push, pop, open_size = make_open_list(isinstance(h, int))
+    # Frontier entries keep only a parent link, the path is rebuilt once the goal is found
+    push(h, 0, (h, key, init_state, None, None))
+    counters["pushes"] = counters["max_frontier"] = 1
+    costs = {init_state: 0}  # Lowest cost found for every state seen, so duplicates are dropped when pushed
+    parents = {}
     total_moves = 0
 
-    while pq:
-        priority, cost, state, path = heapq.heappop(pq)
+    while open_size():
+        priority, cost, (h, key, state, parent, parent_direction) = pop()
         total_moves += 1
-        if is_final_state(state[0], n):
-            return state, path, total_moves  # Return the final state, path, and total moves
-        if state in visited:
+        if cost != costs[state]:
+            counters["duplicates"] += 1  # Pushed again with a lower cost since
             continue
-        visited.add(state)
-        
+        parents[state] = (parent, parent_direction)
+        if is_final_state(state[0], n):
+            save_stats(stats, counters, len(costs))
+            return state, reconstruct_path(parents, state), total_moves  # Return the final state, path, and total moves
+        counters["expanded"] += 1
+
+        new_cost = cost + 1
         for direction in directions:
             neighbor = move(state, direction, n)
-            if neighbor and neighbor not in visited:
-                new_cost = cost + 1
-                new_priority = new_cost + heuristic(neighbor, goal_positions, n)
-                new_path = path + [(direction, neighbor)]
-                heapq.heappush(pq, (new_priority, new_cost, neighbor, new_path))
+            if not neighbor:
+                continue
+            counters["generated"] += 1
+            if new_cost >= costs.get(neighbor, new_cost + 1):
+                counters["duplicates"] += 1
+                continue
+            costs[neighbor] = new_cost
+            new_key = None
+            if delta:
+                # The tile next to the empty cell slid into the old empty cell (i, j)
+                new_board, i, j = neighbor
+                di, dj = direction_offsets[direction]
+                if incremental:
+                    new_h, new_key = delta(key, new_board[i][j], i * n + j, (i + di) * n + j + dj, n)
+                else:
+                    new_h = h + delta(new_board[i][j], (i + di, j + dj), (i, j), goal_positions, n)
+            else:
+                new_h = heuristic(neighbor, goal_positions, n)
+            push(new_cost + new_h, new_cost, (new_h, new_key, neighbor, state, direction))
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], open_size())
+        if callback:
+            report_progress(callback, callback_every, counters, len(costs))
 
+    save_stats(stats, counters, len(costs))
     return None
 
 # Breadth-First Search
-def bfs(init_state, n):
-    queue = [(init_state, [])]
-    visited = set()
+def bfs(init_state, n, packed=False, stats=None, callback=None, callback_every=1):
+    if packed:
+        return bfs_packed(init_state, n, stats, callback, callback_every)
+    counters = start_counters(stats, callback)[0]
+    queue = deque([init_state])
+    parents = {init_state: (None, None)}  # Set when a state is first queued, so duplicates never enter the queue
+    counters["pushes"] = counters["max_frontier"] = 1
     total_moves = 0
 
     while queue:
-        state, path = queue.pop(0)
-        total_moves += 1  
+        state = queue.popleft()
+        total_moves += 1
         if is_final_state(state[0], n):
-            return state, path, total_moves  # Return the final state, path, and total moves
-        if state in visited:
-            continue
-        
-        visited.add(state)
+            save_stats(stats, counters, len(parents))
+            return state, reconstruct_path(parents, state), total_moves  # Return the final state, path, and total moves
+        counters["expanded"] += 1
 
         for direction in directions:
             neighbor = move(state, direction, n)
-            if neighbor and neighbor not in visited:
-                queue.append((neighbor, path + [(direction, neighbor)]))
+            if not neighbor:
+                continue
+            counters["generated"] += 1
+            if neighbor in parents:
+                counters["duplicates"] += 1
+                continue
+            parents[neighbor] = (state, direction)
+            queue.append(neighbor)
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(queue))
+        if callback:
+            report_progress(callback, callback_every, counters, len(parents))
+    save_stats(stats, counters, len(parents))
     return None
 
 # Depth-First Search
-def dfs(init_state, n):
-    stack = [(init_state, [])]
-    visited = set()
+def dfs(init_state, n, packed=False, stats=None, callback=None, callback_every=1):
+    if packed:
+        return dfs_packed(init_state, n, stats, callback, callback_every)
+    counters = start_counters(stats, callback)[0]
+    stack = [(init_state, None, None)]
+    parents = {}  # Doubles as the visited set
+    counters["pushes"] = counters["max_frontier"] = 1
     total_moves = 0
 
     while stack:
-        state, path = stack.pop()
-        total_moves += 1  
+        state, parent, parent_direction = stack.pop()
+        total_moves += 1
         if is_final_state(state[0], n):
-            return state, path, total_moves  # Return the final state, path, and total moves
-        if state in visited:
+            parents[state] = (parent, parent_direction)
+            save_stats(stats, counters, len(parents))
+            return state, reconstruct_path(parents, state), total_moves  # Return the final state, path, and total moves
+        if state in parents:
+            counters["duplicates"] += 1
             continue
 
-        visited.add(state)
+        parents[state] = (parent, parent_direction)
+        counters["expanded"] += 1
 
         for direction in directions:
             neighbor = move(state, direction, n)
-            if neighbor and neighbor not in visited:
-                stack.append((neighbor, path + [(direction, neighbor)]))
+            if not neighbor:
+                continue
+            counters["generated"] += 1
+            if neighbor in parents:
+                counters["duplicates"] += 1
+                continue
+            stack.append((neighbor, state, direction))
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(stack))
+        if callback:
+            report_progress(callback, callback_every, counters, len(parents))
 
+    save_stats(stats, counters, len(parents))
     return None  # If no solution is found
 
 
@@ -190,53 +560,808 @@ def dfs(init_state, n):
 iddfs_total_moves = 0
 
 # Depth-Limited Search
-def dls(state, limit, n):
-    return recursive_dls(state, limit, set(), n)
+def dls(state, limit, n, counters=None, callback=None, callback_every=1):
+    return recursive_dls(state, limit, set(), n, counters, callback, callback_every)
 
-# Recursively implements DLS and tracks total moves
-def recursive_dls(state, limit, visited, n):
+# Recursively implements DLS and tracks total moves. counters, if given, tallies the search stats
+def recursive_dls(state, limit, visited, n, counters=None, callback=None, callback_every=1):
     global iddfs_total_moves
     if is_final_state(state[0], n):
         return state, []  # Return the final state and an empty path
-    
+
     if limit <= 0:
         return None
-    
+
     visited.add(state)
+    if counters is not None:
+        counters["expanded"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(visited))
+        if callback:
+            report_progress(callback, callback_every, counters, counters["max_frontier"])
     for direction in directions:
         neighbor = move(state, direction, n)
-        if neighbor and neighbor not in visited:
-            iddfs_total_moves += 1  # Increment the global move counter
-            result = recursive_dls(neighbor, limit - 1, visited, n)
-            if result:
-                final_state, path = result
-                return final_state, [(direction, neighbor)] + path
-    
+        if not neighbor:
+            continue
+        if counters is not None:
+            counters["generated"] += 1
+        if neighbor in visited:
+            if counters is not None:
+                counters["duplicates"] += 1
+            continue
+        iddfs_total_moves += 1  # Increment the global move counter
+        if counters is not None:
+            counters["pushes"] += 1
+        result = recursive_dls(neighbor, limit - 1, visited, n, counters, callback, callback_every)
+        if result:
+            final_state, path = result
+            return final_state, [(direction, neighbor)] + path
+
     visited.remove(state)
     return None
 
 # Iterative Deepening Depth-First Search
-def iddfs(init_state, n):
+def iddfs(init_state, n, packed=False, stats=None, callback=None, callback_every=1):
     global iddfs_total_moves
+    if packed:
+        return iddfs_packed(init_state, n, stats, callback, callback_every)
     iddfs_total_moves = 0  # Initialize the move counter
+    counters = start_counters(stats, callback)[0]
     depth = 0
     accumulated_path = []
-    
+
     while True:
-        result = dls(init_state, depth, n)
+        result = dls(init_state, depth, n, counters, callback, callback_every)
         if result:
             final_state, path = result
             accumulated_path.extend(path)
+            save_stats(stats, counters, counters["max_frontier"])
             return final_state, accumulated_path, iddfs_total_moves
         depth += 1
 
-# Computes number of inversions
+# A* on packed states. Visited holds one int per board instead of (board, row, column) tuples
+def a_star_packed(init_state, heuristic, n, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_positions = get_goal_positions(n)
+    positions = [divmod(index, n) for index in range(n * n)]
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    incremental = get_incremental_heuristic(heuristic)
+    # With an incremental heuristic, delta is its step function
+    counters, heuristic, delta = start_counters(stats, callback, heuristic, incremental[1] if incremental else heuristic_deltas.get(heuristic))
+    h = heuristic(init_state, goal_positions, n)
+    key = incremental[0]([tile for row in init_state[0] for tile in row], n)[1] if incremental else None
+    push, pop, open_size = make_open_list(isinstance(h, int))
+    push(h, 0, (h, key, start_code, start_blank, None))
+    counters["pushes"] = counters["max_frontier"] = 1
+    costs = {start_code: 0}  # Lowest cost found for every code seen, so duplicates are dropped when pushed
+    parents = {}  # Maps each expanded code to its parent code
+    total_moves = 0
+
+    while open_size():
+        priority, cost, (h, key, code, blank, parent) = pop()
+        total_moves += 1
+        if cost != costs[code]:
+            counters["duplicates"] += 1  # Pushed again with a lower cost since
+            continue
+        parents[code] = parent
+        if code == goal_code:
+            save_stats(stats, counters, len(costs))
+            return packed_result(init_state, packed_path_from_parents(parents, code, n), total_moves, n)
+        counters["expanded"] += 1
+
+        new_cost = cost + 1
+        for direction, target in move_table[blank]:
+            neighbor = packed_move(code, blank, target, bits, mask)
+            counters["generated"] += 1
+            if new_cost >= costs.get(neighbor, new_cost + 1):
+                counters["duplicates"] += 1
+                continue
+            costs[neighbor] = new_cost
+            new_key = None
+            if incremental:
+                new_h, new_key = delta(key, (code >> (target * bits)) & mask, blank, target, n)
+            elif delta:
+                tile = (code >> (target * bits)) & mask
+                new_h = h + delta(tile, positions[target], positions[blank], goal_positions, n)
+            else:
+                new_h = heuristic((unpack_board(neighbor, n), -1, -1), goal_positions, n)
+            push(new_cost + new_h, new_cost, (new_h, new_key, neighbor, target, code))
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], open_size())
+        if callback:
+            report_progress(callback, callback_every, counters, len(costs))
+
+    save_stats(stats, counters, len(costs))
+    return None
+
+# Breadth-First Search on packed states
+def bfs_packed(init_state, n, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters = start_counters(stats, callback)[0]
+    queue = deque([(start_code, start_blank)])
+    parents = {start_code: None}  # Maps each queued code to its parent code and doubles as the visited set
+    counters["pushes"] = counters["max_frontier"] = 1
+    total_moves = 0
+
+    while queue:
+        code, blank = queue.popleft()
+        total_moves += 1
+        if code == goal_code:
+            save_stats(stats, counters, len(parents))
+            return packed_result(init_state, packed_path_from_parents(parents, code, n), total_moves, n)
+        counters["expanded"] += 1
+
+        for direction, target in move_table[blank]:
+            neighbor = packed_move(code, blank, target, bits, mask)
+            counters["generated"] += 1
+            if neighbor in parents:
+                counters["duplicates"] += 1
+                continue
+            parents[neighbor] = code
+            queue.append((neighbor, target))
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(queue))
+        if callback:
+            report_progress(callback, callback_every, counters, len(parents))
+    save_stats(stats, counters, len(parents))
+    return None
+
+# Bidirectional Breadth-First Search on packed states. One layer at a time is expanded from
+# whichever side has the smaller frontier, and the search stops after the layer in which the
+# two sides first meet, keeping the shortest meeting path found in that layer
+def bidirectional_bfs(init_state, n, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters = start_counters(stats, callback)[0]
+    total_moves = 0
+    if start_code == goal_code:
+        counters["pushes"] = counters["max_frontier"] = 1
+        save_stats(stats, counters, 1)
+        return init_state, [], total_moves
+
+    # Parent links and depth of every code seen from each side
+    forward = {start_code: (None, 0)}
+    backward = {goal_code: (None, 0)}
+    forward_layer = [(start_code, start_blank)]
+    backward_layer = [(goal_code, n * n - 1)]
+    counters["pushes"] = counters["max_frontier"] = 2
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            layer, seen, other = forward_layer, forward, backward
+        else:
+            layer, seen, other = backward_layer, backward, forward
+        next_layer = []
+        best = None
+        for code, blank in layer:
+            total_moves += 1
+            counters["expanded"] += 1
+            depth = seen[code][1] + 1
+            for direction, target in move_table[blank]:
+                neighbor = packed_move(code, blank, target, bits, mask)
+                counters["generated"] += 1
+                if neighbor in seen:
+                    counters["duplicates"] += 1
+                    continue
+                seen[neighbor] = (code, depth)
+                next_layer.append((neighbor, target))
+                counters["pushes"] += 1
+                if neighbor in other and (best is None or depth + other[neighbor][1] < best[1]):
+                    best = (neighbor, depth + other[neighbor][1])
+            if callback:
+                report_progress(callback, callback_every, counters, len(forward) + len(backward))
+        counters["max_frontier"] = max(counters["max_frontier"], len(next_layer) + len(backward_layer if layer is forward_layer else forward_layer))
+        if best:
+            save_stats(stats, counters, len(forward) + len(backward))
+            # Codes from the start up to the meeting point, then on to the goal
+            codes = []
+            code = best[0]
+            while code is not None:
+                codes.append(code)
+                code = forward[code][0]
+            codes.reverse()
+            code = backward[best[0]][0]
+            while code is not None:
+                codes.append(code)
+                code = backward[code][0]
+            return packed_result(init_state, packed_path_from_codes(codes, n), total_moves, n)
+        if layer is forward_layer:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    save_stats(stats, counters, len(forward) + len(backward))
+    return None
+
+# Depth-First Search on packed states
+def dfs_packed(init_state, n, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters = start_counters(stats, callback)[0]
+    stack = [(start_code, start_blank, None)]
+    parents = {}  # Maps each expanded code to its parent code and doubles as the visited set
+    counters["pushes"] = counters["max_frontier"] = 1
+    total_moves = 0
+
+    while stack:
+        code, blank, parent = stack.pop()
+        total_moves += 1
+        if code == goal_code:
+            parents[code] = parent
+            save_stats(stats, counters, len(parents))
+            return packed_result(init_state, packed_path_from_parents(parents, code, n), total_moves, n)
+        if code in parents:
+            counters["duplicates"] += 1
+            continue
+
+        parents[code] = parent
+        counters["expanded"] += 1
+
+        for direction, target in move_table[blank]:
+            neighbor = packed_move(code, blank, target, bits, mask)
+            counters["generated"] += 1
+            if neighbor in parents:
+                counters["duplicates"] += 1
+                continue
+            stack.append((neighbor, target, code))
+            counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(stack))
+        if callback:
+            report_progress(callback, callback_every, counters, len(parents))
+
+    save_stats(stats, counters, len(parents))
+    return None  # If no solution is found
+
+# Iterative Deepening DFS on packed states. The move counter is local, so this version is re-entrant
+def iddfs_packed(init_state, n, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters = start_counters(stats, callback)[0]
+    total_moves = 0
+    path = []
+    on_path = set()
+
+    def recursive_dls_packed(code, blank, limit):
+        nonlocal total_moves
+        if code == goal_code:
+            return True
+        if limit <= 0:
+            return False
+
+        on_path.add(code)
+        counters["expanded"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], len(on_path))
+        if callback:
+            report_progress(callback, callback_every, counters, counters["max_frontier"])
+        for direction, target in move_table[blank]:
+            neighbor = packed_move(code, blank, target, bits, mask)
+            counters["generated"] += 1
+            if neighbor in on_path:
+                counters["duplicates"] += 1
+                continue
+            total_moves += 1
+            counters["pushes"] += 1
+            path.append((direction, target))
+            if recursive_dls_packed(neighbor, target, limit - 1):
+                return True
+            path.pop()
+        on_path.remove(code)
+        return False
+
+    depth = 0
+    while not recursive_dls_packed(start_code, start_blank, depth):
+        depth += 1
+    save_stats(stats, counters, counters["max_frontier"])
+    return packed_result(init_state, path, total_moves, n)
+
+# Slack for the float heuristics (Euclidean Distance) in IDA*, whose values are sums of per-move
+# deltas and can land a rounding error above a whole number of moves
+float_slack = 1e-9
+
+# IDA* with in-place move/undo on a flat board. Memory is proportional to the solution depth,
+# moving the empty cell straight back is pruned, and the counter is returned per call. Every
+# move costs 1, so every solution length is a whole number and the bound is rounded up to one;
+# with a fractional heuristic this saves an iteration per distinct f value
+def ida_star(init_state, heuristic, n, stats=None, callback=None, callback_every=1):
+    goal_positions = get_goal_positions(n)
+    move_table = get_move_table(n)
+    positions = [divmod(index, n) for index in range(n * n)]
+    goal_tiles = [tile for row in get_goal_board(n) for tile in row]
+    tiles = [tile for row in init_state[0] for tile in row]
+    delta = heuristic_deltas.get(heuristic)
+    incremental = get_incremental_heuristic(heuristic)
+    counters, initial_heuristic = start_counters(stats, callback, heuristic)[:2]
+    moves = []
+    keys = []  # Keys of the incremental heuristic along the current path
+    total_moves = 0
+
+    # Slides the tile at target into the blank and returns the heuristic of the new board
+    def apply_move(blank, target, h):
+        tile = tiles[target]
+        if heuristic is linear_conflict_distance:
+            # Only the two rows (vertical move) or two columns (horizontal move) touched by the tile change
+            if positions[target][0] == positions[blank][0]:
+                lines, line_conflicts = (positions[target][1], positions[blank][1]), column_conflicts
+            else:
+                lines, line_conflicts = (positions[target][0], positions[blank][0]), row_conflicts
+            before = sum(line_conflicts(tiles, line, goal_positions, n) for line in lines)
+            tiles[blank], tiles[target] = tile, 0
+            after = sum(line_conflicts(tiles, line, goal_positions, n) for line in lines)
+            return h + manhattan_delta(tile, positions[target], positions[blank], goal_positions, n) + 2 * (after - before)
+        if incremental:
+            new_h, key = incremental[1](keys[-1], tile, blank, target, n)
+            keys.append(key)
+            tiles[blank], tiles[target] = tile, 0
+            return new_h
+        tiles[blank], tiles[target] = tile, 0
+        if delta:
+            return h + delta(tile, positions[target], positions[blank], goal_positions, n)
+        board = tuple(tuple(tiles[i:i + n]) for i in range(0, n * n, n))
+        return heuristic((board, -1, -1), goal_positions, n)
+
+    if stats is not None or callback:
+        # The heuristic update is interleaved with the move, so the whole step is counted and timed
+        apply_move = count_calls(apply_move, counters)
+
+    def search(blank, prev_blank, g, h):
+        nonlocal total_moves, next_bound
+        f = g + h
+        if f > bound + float_slack:
+            next_bound = min(next_bound, f)
+            return False
+        if tiles == goal_tiles:
+            return True
+        counters["expanded"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], g + 1)
+        if callback:
+            report_progress(callback, callback_every, counters, counters["max_frontier"])
+        for direction, target in move_table[blank]:
+            counters["generated"] += 1
+            if target == prev_blank:
+                counters["duplicates"] += 1
+                continue
+            total_moves += 1
+            counters["pushes"] += 1
+            new_h = apply_move(blank, target, h)
+            moves.append((direction, target))
+            if search(target, blank, g + 1, new_h):
+                return True
+            moves.pop()
+            tiles[target], tiles[blank] = tiles[blank], 0  # Undo the move
+            if incremental:
+                keys.pop()
+        return False
+
+    h = initial_heuristic(init_state, goal_positions, n)
+    if incremental:
+        keys.append(incremental[0](tiles, n)[1])
+    bound = math.ceil(h - float_slack)
+    while True:
+        next_bound = float('inf')
+        if search(tiles.index(0), -1, 0, h):
+            save_stats(stats, counters, counters["max_frontier"])
+            return packed_result(init_state, moves, total_moves, n)
+        if next_bound == float('inf'):
+            save_stats(stats, counters, counters["max_frontier"])
+            return None
+        bound = math.ceil(next_bound - float_slack)
+
+# Memory-bounded A* in the style of SMA*, on packed states. At most node_budget search nodes are
+# kept in memory. Once the children of an expansion go over the budget, the worst open leaves
+# (highest f, then shallowest) are forgotten and their f is backed up into their parent, which
+# goes back on the open list so the forgotten children are generated again if that f becomes
+# the best. Only the move straight back is pruned, so a state reached along two paths is held
+# twice, as in SMA*. Nodes too deep for a path through them to fit in the budget get an infinite f.
+# Optimal with an admissible heuristic when the budget can hold a solution path, otherwise None
+def sma_star(init_state, heuristic, n, node_budget=100000, stats=None, callback=None, callback_every=1):
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_positions = get_goal_positions(n)
+    positions = [divmod(index, n) for index in range(n * n)]
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters, heuristic, delta = start_counters(stats, callback, heuristic, heuristic_deltas.get(heuristic))
+    counters["pruned"] = 0
+    node_budget = max(node_budget, 2)
+    infinity = float('inf')
+
+    # A node is [f, g, h, code, blank, parent, direction, children, open entry number]. On the open
+    # list f is the lowest f of the node's children that are not in memory. The entry number is 0
+    # while the node is off the open list, so its older heap entries can be skipped
+    h = heuristic(init_state, goal_positions, n)
+    root = [h, 0, h, start_code, start_blank, None, None, [], 0]
+    best = []  # Open nodes by (f, -g), to expand
+    worst = []  # The same nodes by (-f, g), to forget
+    entry_number = 0
+    open_count = 0
+    node_count = 1
+    total_moves = 0
+
+    def push(node):
+        nonlocal entry_number, open_count
+        if not node[8]:
+            open_count += 1
+        entry_number += 1
+        node[8] = entry_number
+        heapq.heappush(best, (node[0], -node[1], entry_number, node))
+        heapq.heappush(worst, (-node[0], node[1], entry_number, node))
+        counters["pushes"] += 1
+        counters["max_frontier"] = max(counters["max_frontier"], open_count)
+
+    # Drops an open leaf and backs its f up into its parent, which is put back on the open list
+    def forget(leaf):
+        nonlocal node_count, open_count
+        leaf[8] = 0
+        open_count -= 1
+        node_count -= 1
+        counters["pruned"] += 1
+        parent = leaf[5]
+        parent[7].remove(leaf)
+        if not parent[8] or leaf[0] < parent[0] or not parent[7]:
+            parent[0] = leaf[0] if not parent[8] else min(parent[0], leaf[0])
+            push(parent)
+
+    push(root)
+    while best:
+        f, neg_g, number, node = heapq.heappop(best)
+        if node[8] != number:
+            continue
+        node[8] = 0
+        open_count -= 1
+        total_moves += 1
+        if f == infinity:
+            break  # No path to the goal fits in the budget
+        code, blank = node[3], node[4]
+        if code == goal_code:
+            packed_path = []
+            while node[5] is not None:
+                packed_path.append((node[6], node[4]))
+                node = node[5]
+            packed_path.reverse()
+            save_stats(stats, counters, node_count)
+            return packed_result(init_state, packed_path, total_moves, n)
+        counters["expanded"] += 1
+
+        # Generates the children that are not in memory, skipping the move straight back
+        g = node[1] + 1
+        held = [child[3] for child in node[7]]
+        if node[5] is not None:
+            held.append(node[5][3])
+        for direction, target in move_table[blank]:
+            neighbor = packed_move(code, blank, target, bits, mask)
+            counters["generated"] += 1
+            if neighbor in held:
+                counters["duplicates"] += 1
+                continue
+            if delta:
+                tile = (code >> (target * bits)) & mask
+                new_h = node[2] + delta(tile, positions[target], positions[blank], goal_positions, n)
+            else:
+                new_h = heuristic((unpack_board(neighbor, n), -1, -1), goal_positions, n)
+            if neighbor != goal_code and g >= node_budget - 1:
+                new_f = infinity
+            else:
+                new_f = max(g + new_h, f)  # A child's f never drops below the f its parent was expanded with
+            child = [new_f, g, new_h, neighbor, target, node, direction, [], 0]
+            node[7].append(child)
+            node_count += 1
+            push(child)
+
+        while node_count > node_budget:
+            neg_f, g, number, leaf = heapq.heappop(worst)
+            # Only leaves can be forgotten, a node that loses its last child gets a new entry
+            if leaf[8] == number and not leaf[7] and leaf[5] is not None:
+                forget(leaf)
+        if len(worst) > 2 * node_budget + 8:
+            # Drop heap entries of nodes that have left the open list, so the heaps stay within the budget too
+            best[:] = [entry for entry in best if entry[3][8] == entry[2]]
+            worst[:] = [entry for entry in worst if entry[3][8] == entry[2]]
+            heapq.heapify(best)
+            heapq.heapify(worst)
+        if callback:
+            report_progress(callback, callback_every, counters, node_count)
+
+    save_stats(stats, counters, node_count)
+    return None
+
+# Anytime A* in the style of ARA*, on packed states. Weighted A* (f = g + weight * h) finds a
+# first solution quickly, then the weight is lowered by weight_step and the search continues from
+# the states it already has, reopening only those whose path got shorter, until the weight reaches
+# 1 (the solution is optimal) or time_limit seconds have passed. Returns the best solution found
+# in time, or None if there is none yet. stats also gets "bound": the returned path is at most
+# bound times longer than the optimal one, and "solutions": (seconds, path moves, bound) for
+# every improvement
+def anytime_a_star(init_state, heuristic, n, time_limit=1.0, weight=3.0, weight_step=0.5, stats=None, callback=None, callback_every=1):
+    start_time = time.time()
+    bits = get_tile_bits(n)
+    mask = (1 << bits) - 1
+    move_table = get_move_table(n)
+    goal_positions = get_goal_positions(n)
+    positions = [divmod(index, n) for index in range(n * n)]
+    goal_code = pack_board(get_goal_board(n), n)
+    start_code, start_blank = pack_state(init_state, n)
+    counters, heuristic, delta = start_counters(stats, callback, heuristic, heuristic_deltas.get(heuristic))
+    weight = max(weight, 1.0)
+    infinity = float('inf')
+
+    costs = {start_code: 0}
+    parents = {start_code: None}
+    h_values = {start_code: heuristic(init_state, goal_positions, n)}
+    blanks = {start_code: start_blank}
+    # Heap entries are (f, -g, code): among equal f the deepest state, the closest to a goal, comes first
+    pq = [(weight * h_values[start_code], 0, start_code)]
+    counters["pushes"] = counters["max_frontier"] = 1
+    closed = set()
+    reopened = set()  # Closed states whose path got shorter, searched again with the next weight
+    best_path = None
+    solutions = []
+    total_moves = 0
+    out_of_time = False
+    finished_weight = infinity  # Weight of the last search that ran to completion
+
+    while True:
+        # Expands while a state could still lead to a shorter solution under this weight
+        while pq and pq[0][0] < costs.get(goal_code, infinity):
+            if total_moves % 1024 == 0 and time.time() - start_time >= time_limit:
+                out_of_time = True
+                break
+            f, cost, code = heapq.heappop(pq)
+            cost = -cost
+            total_moves += 1
+            if cost != costs[code] or code in closed:
+                counters["duplicates"] += 1
+                continue
+            closed.add(code)
+            counters["expanded"] += 1
+            blank = blanks[code]
+            new_cost = cost + 1
+            for direction, target in move_table[blank]:
+                neighbor = packed_move(code, blank, target, bits, mask)
+                counters["generated"] += 1
+                if new_cost >= costs.get(neighbor, infinity):
+                    counters["duplicates"] += 1
+                    continue
+                costs[neighbor] = new_cost
+                parents[neighbor] = code
+                blanks[neighbor] = target
+                if neighbor not in h_values:
+                    if delta:
+                        tile = (code >> (target * bits)) & mask
+                        h_values[neighbor] = h_values[code] + delta(tile, positions[target], positions[blank], goal_positions, n)
+                    else:
+                        h_values[neighbor] = heuristic((unpack_board(neighbor, n), -1, -1), goal_positions, n)
+                if neighbor in closed:
+                    reopened.add(neighbor)
+                else:
+                    heapq.heappush(pq, (new_cost + weight * h_values[neighbor], -new_cost, neighbor))
+                    counters["pushes"] += 1
+            counters["max_frontier"] = max(counters["max_frontier"], len(pq))
+            if callback:
+                report_progress(callback, callback_every, counters, len(costs))
+
+        if not out_of_time:
+            finished_weight = weight
+        if goal_code in costs and (best_path is None or costs[goal_code] < len(best_path)):
+            best_path = packed_path_from_parents(parents, goal_code, n)
+        if best_path is not None:
+            # Every solution left costs at least the lowest g + h of the states still to be searched
+            lower_bound = min([costs[code] + h_values[code] for f, cost, code in pq if -cost == costs[code] and code not in closed] +
+                              [costs[code] + h_values[code] for code in reopened] + [len(best_path)])
+            bound = min(finished_weight, len(best_path) / lower_bound) if lower_bound else 1.0
+            if not solutions or len(best_path) < solutions[-1][1] or bound < solutions[-1][2]:
+                solutions.append((time.time() - start_time, len(best_path), bound))
+        if out_of_time or weight == 1.0 or time.time() - start_time >= time_limit:
+            break
+
+        # Lowers the weight and searches again from the open and reopened states
+        weight = max(1.0, weight - weight_step)
+        pq = [(costs[code] + weight * h_values[code], -costs[code], code)
+              for f, cost, code in pq if -cost == costs[code] and code not in closed]
+        pq.extend((costs[code] + weight * h_values[code], -costs[code], code) for code in reopened)
+        heapq.heapify(pq)
+        closed = set()
+        reopened = set()
+
+    save_stats(stats, counters, len(costs))
+    if stats is not None:
+        stats.update(bound=solutions[-1][2] if solutions else None, weight=weight, solutions=solutions)
+    if best_path is None:
+        return None
+    return packed_result(init_state, best_path, total_moves, n)
+
+# Shortest route of cells from start to goal (start excluded) through cells not in blocked, or None
+def find_route(start, goal, blocked, move_table):
+    if start == goal:
+        return []
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        for direction, target in move_table[cell]:
+            if target in previous or target in blocked:
+                continue
+            previous[target] = cell
+            if target == goal:
+                route = []
+                while target != start:
+                    route.append(target)
+                    target = previous[target]
+                route.reverse()
+                return route
+            queue.append(target)
+    return None
+
+# Drops every move that is immediately undone by the next one and recomputes the target indexes
+def remove_redundant_moves(moves, blank, n):
+    opposite = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+    kept = []
+    for direction, target in moves:
+        if kept and kept[-1] == opposite[direction]:
+            kept.pop()
+        else:
+            kept.append(direction)
+    simplified = []
+    for direction in kept:
+        di, dj = direction_offsets[direction]
+        blank += di * n + dj
+        simplified.append((direction, blank))
+    return simplified
+
+# Rebuilds the (direction, state) path of (direction, target index) moves on large boards. Only
+# the one or two rows a move changes are rebuilt, the other row tuples are shared with the
+# previous state, so each move costs O(n) instead of O(n*n)
+def replay_moves(init_state, moves, n):
+    rows = list(init_state[0])
+    blank = [tile for row in rows for tile in row].index(0)
+    path = []
+    for direction, target in moves:
+        row, column = divmod(blank, n)
+        target_row, target_column = divmod(target, n)
+        if row == target_row:
+            changed = list(rows[row])
+            changed[column], changed[target_column] = changed[target_column], 0
+            rows[row] = tuple(changed)
+        else:
+            changed, target_changed = list(rows[row]), list(rows[target_row])
+            changed[column], target_changed[target_column] = target_changed[target_column], 0
+            rows[row], rows[target_row] = tuple(changed), tuple(target_changed)
+        path.append((direction, (tuple(rows), row, column)))
+        blank = target
+    return path
+
+# Constructive solver for any n. The top row and then the left column of the unsolved part of the
+# board are placed one tile at a time, leaving a board one size smaller, until the last 3x3 is
+# solved optimally with bidirectional BFS. Solutions are far from optimal, but an 8x8 takes
+# milliseconds. Moves that are straight away undone are removed unless simplify is False. stats gets
+# "expanded" (tiles placed), "generated" (moves made) and "removed" (redundant moves dropped)
+def constructive_solve(init_state, n, stats=None, callback=None, callback_every=1, simplify=True):
+    tiles = [tile for row in init_state[0] for tile in row]
+    if not is_solvable(tiles, n):
+        return None
+    counters = start_counters(stats, callback)[0]
+    move_table = get_move_table(n)
+    start_blank = blank = tiles.index(0)
+    locked = set()  # Cells whose tiles are in place
+    moves = []
+
+    # Slides the tile at the neighboring cell target into the blank
+    def slide(target):
+        nonlocal blank
+        tiles[blank], tiles[target] = tiles[target], 0
+        moves.append((offset_directions[(target // n - blank // n, target % n - blank % n)], target))
+        blank = target
+
+    def move_blank(goal, blocked):
+        for cell in find_route(blank, goal, blocked, move_table):
+            slide(cell)
+
+    # Moves a tile to the goal cell one step at a time, bringing the blank around in front of it
+    def move_tile(tile, goal):
+        position = tiles.index(tile)
+        for cell in find_route(position, goal, locked, move_table):
+            locked.add(position)
+            move_blank(cell, locked)
+            locked.discard(position)
+            slide(position)
+            position = cell
+        counters["expanded"] += 1
+
+    # Moves the tile for last into first and makes sure the blank is not shut in the corner at last
+    def park(first, last, beside):
+        move_tile(last + 1, first)
+        if blank == last:
+            slide(last + beside - first)
+
+    # Places the last two tiles of a row or column, whose goal cells are first and last. The tile
+    # for last is parked in first and the tile for first next to it (at beside), then the blank
+    # comes round through last and both tiles rotate into place. If the tile for first got trapped
+    # in last, it is moved away (to far) and held there while the other tile is parked again
+    def place_pair(first, last, beside, far):
+        if tiles[first] == first + 1 and tiles[last] == last + 1:
+            return
+        park(first, last, beside)
+        if tiles[last] == first + 1:
+            move_tile(first + 1, far)
+            locked.add(far)
+            park(first, last, beside)
+            locked.discard(far)
+        locked.add(first)
+        move_tile(first + 1, beside)
+        locked.add(beside)
+        move_blank(last, locked)
+        slide(first)
+        slide(beside)
+        locked.discard(beside)
+
+    for k in range(n - 3):
+        # Top row of the unsolved part, then its left column
+        for col in range(k, n - 2):
+            move_tile(k * n + col + 1, k * n + col)
+            locked.add(k * n + col)
+        place_pair(k * n + n - 2, k * n + n - 1, (k + 1) * n + n - 2, (k + 2) * n + n - 2)
+        locked.update((k * n + n - 2, k * n + n - 1))
+        for row in range(k + 1, n - 2):
+            move_tile(row * n + k + 1, row * n + k)
+            locked.add(row * n + k)
+        place_pair((n - 2) * n + k, (n - 1) * n + k, (n - 2) * n + k + 1, (n - 2) * n + k + 2)
+        locked.update(((n - 2) * n + k, (n - 1) * n + k))
+        if callback:
+            report_progress(callback, callback_every, counters, len(locked))
+
+    # The last (at most) 3x3 corner, relabeled as a small board with its own goal
+    size = min(n, 3)
+    corner = [(n - size + i) * n + n - size + j for i in range(size) for j in range(size)]
+    labels = {cell + 1: index + 1 for index, cell in enumerate(corner[:-1])}
+    labels[0] = 0
+    small_tiles = [labels[tiles[cell]] for cell in corner]
+    small_state = (tuple(tuple(small_tiles[i:i + size]) for i in range(0, size * size, size)), -1, -1)
+    for direction, state in bidirectional_bfs(small_state, size)[1]:
+        di, dj = direction_offsets[direction]
+        slide(blank + di * n + dj)
+
+    counters["generated"] = total_moves = len(moves)
+    if simplify:
+        moves = remove_redundant_moves(moves, start_blank, n)
+    counters["removed"] = total_moves - len(moves)
+    save_stats(stats, counters, len(locked))
+    path = replay_moves(init_state, moves, n)
+    return path[-1][1] if path else init_state, path, total_moves
+
+# Computes number of inversions in O(n*n log n). A Fenwick tree over tile values counts how many
+# of the tiles already seen are smaller than each new one
 def count_inversions(board_as_array):
+    tree = [0] * len(board_as_array)
     inv_count = 0
-    for i in range(len(board_as_array)):
-        for j in range(i + 1, len(board_as_array)):
-            if board_as_array[i] > board_as_array[j] and board_as_array[i] != 0 and board_as_array[j] != 0:
-                inv_count += 1
+    seen = 0
+    for tile in board_as_array:
+        if tile == 0:
+            continue
+        smaller = 0
+        i = tile
+        while i > 0:
+            smaller += tree[i]
+            i -= i & -i
+        inv_count += seen - smaller
+        seen += 1
+        i = tile
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
     return inv_count
 
 # Determines whether a given puzzle is solvable based on even or odd number of inversions
@@ -280,43 +1405,150 @@ def save_moves_to_file(init_state, moves_results, filename):
     except Exception as e:
         print(f"An error occurred while saving moves to file: {e}")
 
-# Runs all algorithms/heuristics on each puzzle for automated data collection
-def run_algorithms_on_state(initial_state, n, results, state_number, total_states):
-    print(f"Running tests for puzzle {state_number}/{total_states}: {initial_state[0]}")
-
-    heuristics = {
+# Heuristics by name
+def get_heuristics():
+    from walking_distance import walking_distance
+    return {
         "Manhattan Distance": manhattan_distance,
         "Hamming Distance": hamming_distance,
         "Euclidean Distance": euclidean_distance,
-        "Chebyshev Distance": chebyshev_distance
+        "Chebyshev Distance": chebyshev_distance,
+        "Linear Conflict": linear_conflict_distance,
+        "Walking Distance": walking_distance
     }
-    
+
+# Algorithms and heuristics used by automated data collection (DFS is left out due to extreme inefficiency)
+def get_algorithms(include_dfs=False):
+    heuristics = get_heuristics()
     algorithms = [
         ("A*", a_star, heuristics),
+        ("IDA*", ida_star, heuristics),
+        ("SMA*", sma_star, heuristics),
         ("BFS", bfs, None),
-        ("IDDFS", iddfs, None)
+        ("Bidirectional BFS", bidirectional_bfs, None),
+        ("IDDFS", iddfs, None),
+        ("Constructive", constructive_solve, None)
     ]
-    
-    for algo_name, algo_func, algo_heuristics in algorithms:
-        if algo_heuristics:
-            for heuristic_name, heuristic_func in algo_heuristics.items():
+    from batched_search import np, batched_a_star, batched_beam_search
+    if np is not None:
+        # The batched searches need NumPy and support only the heuristics they can vectorize
+        batch_heuristics = {name: heuristics[name] for name in ("Manhattan Distance", "Linear Conflict")}
+        algorithms += [("Batched A*", batched_a_star, batch_heuristics), ("Beam Search", batched_beam_search, batch_heuristics)]
+    if include_dfs:
+        algorithms.append(("DFS", dfs, None))
+    return algorithms
+
+# Algorithms whose solutions are as short as possible (with any of the heuristics), and so can be cached
+optimal_algorithms = ("A*", "IDA*", "SMA*", "BFS", "Bidirectional BFS", "IDDFS", "Batched A*")
+
+# Every 3x3 board has a precomputed optimal length to check the path lengths against
+def get_optimal_length(initial_state, n):
+    if n != 3:
+        return None
+    from oracle import optimal_length
+    return optimal_length(initial_state[0])
+
+# Runs one algorithm/heuristic pair by name and returns the time taken and the search result.
+# stats is filled with the search counters; profile runs the search under cProfile and is the
+# file to save the profile to (True prints a summary instead)
+def run_algorithm(initial_state, n, algo_name, heuristic_name=None, stats=None, profile=None):
+    for name, algo_func, algo_heuristics in get_algorithms(include_dfs=True):
+        if name == algo_name:
+            args = (initial_state, algo_heuristics[heuristic_name], n) if algo_heuristics else (initial_state, n)
+            start_time = time.perf_counter()
+            if profile:
+                result = run_profiled(None if profile is True else profile, algo_func, *args, stats=stats)
+            else:
+                result = algo_func(*args, stats=stats)
+            return time.perf_counter() - start_time, result
+    raise ValueError(f"Unknown algorithm {algo_name}.")
+
+# Builds one automated data collection row, unsolved runs are kept with their status
+def make_result_row(initial_state, algo_name, heuristic_name, time_taken, result, optimal, status=None):
+    if result:
+        solution, path, total_moves = result
+        return (initial_state[0], algo_name, heuristic_name, time_taken, total_moves, len(path), optimal, status or "solved")
+    return (initial_state[0], algo_name, heuristic_name, time_taken, None, None, optimal, status or "no solution")
+
+# Builds the structured result returned by solve(). cached is True when the moves came from a solution cache
+def make_solve_result(initial_state, n, algo_name, heuristic_name, time_taken, result, status=None, stats=None, cached=False):
+    solve_result = {
+        "board": [tile for row in initial_state[0] for tile in row],
+        "n": n,
+        "algorithm": algo_name,
+        "heuristic": heuristic_name,
+        "status": status or ("solved" if result else "no solution"),
+        "time": time_taken,
+        "total_moves": None,
+        "path_moves": None,
+        "moves": None,
+        "stats": stats,
+        "cached": cached
+    }
+    if result:
+        solution, path, total_moves = result
+        solve_result.update(total_moves=total_moves, path_moves=len(path), moves=[direction for direction, state in path])
+    return solve_result
+
+# Checks an algorithm/heuristic pair by name and returns the heuristic to use (None if the algorithm takes none)
+def check_algorithm(algorithm, heuristic):
+    algorithms = {algo_name: algo_heuristics for algo_name, algo_func, algo_heuristics in get_algorithms(include_dfs=True)}
+    if algorithm not in algorithms:
+        raise ValueError(f"Unknown algorithm {algorithm}. Choose from: {', '.join(algorithms)}.")
+    if algorithms[algorithm] is None:
+        return None
+    if heuristic not in algorithms[algorithm]:
+        raise ValueError(f"Unknown heuristic {heuristic}. Choose from: {', '.join(algorithms[algorithm])}.")
+    return heuristic
+
+# Non-interactive entry point. board is a flat list or a list of rows. limits is an optional
+# {"time": seconds, "memory": MB} budget, enforced by running the search in a child process.
+# Raises ValueError for a malformed board or an unknown algorithm/heuristic, and returns a dict
+# whose status is "solved", "unsolvable", "no solution", "timed out", "out of memory" or "failed".
+# The search counters are returned under "stats" when the search runs in this process (no limits),
+# and profile is passed on to run_algorithm. With a cache from solution_cache.open_cache(), boards
+# on a cached solution are answered from it by the algorithms in optimal_algorithms, which also
+# add the solutions they find
+def solve(board, n, algorithm="A*", heuristic="Manhattan Distance", limits=None, profile=None, cache=None):
+    if board and isinstance(board[0], (list, tuple)):
+        board = [tile for row in board for tile in row]
+    initial_state = init_state(list(board), n)
+    heuristic = check_algorithm(algorithm, heuristic)
+    if not is_solvable(list(board), n):
+        return make_solve_result(initial_state, n, algorithm, heuristic, 0, None, "unsolvable")
+    if cache is not None and algorithm in optimal_algorithms:
+        from solution_cache import cached_result, store_solution
+        start_time = time.time()
+        result = cached_result(cache, initial_state, n)
+        if result:
+            return make_solve_result(initial_state, n, algorithm, heuristic, time.time() - start_time, result, cached=True)
+
+    if limits:
+        from collect import collect_results
+        job = (None, initial_state, algorithm, heuristic, None)
+        for job, status, time_taken, result, stats in collect_results([job], n, 1, limits.get("time"), limits.get("memory")):
+            solve_result = make_solve_result(initial_state, n, algorithm, heuristic, time_taken, result, status)
+    else:
+        stats = {}
+        time_taken, result = run_algorithm(initial_state, n, algorithm, heuristic, stats, profile)
+        solve_result = make_solve_result(initial_state, n, algorithm, heuristic, time_taken, result, stats=stats)
+    if cache is not None and algorithm in optimal_algorithms and solve_result["moves"] is not None:
+        store_solution(cache, board, n, solve_result["moves"])
+    return solve_result
+
+# Runs all algorithms/heuristics on each puzzle for automated data collection
+def run_algorithms_on_state(initial_state, n, results, state_number, total_states):
+    print(f"Running tests for puzzle {state_number}/{total_states}: {initial_state[0]}")
+    optimal = get_optimal_length(initial_state, n)
+
+    for algo_name, algo_func, algo_heuristics in get_algorithms():
+        for heuristic_name in (algo_heuristics or [None]):
+            if heuristic_name:
                 print(f"Running {algo_name} with {heuristic_name}...")
-                start_time = time.time()
-                result = algo_func(initial_state, heuristic_func, n)
-                end_time = time.time()
-                if result:
-                    solution, path, total_moves = result
-                    num_moves = len(path)
-                    results.append((initial_state[0], algo_name, heuristic_name, end_time - start_time, total_moves, num_moves))
-        else:
-            print(f"Running {algo_name}...")
-            start_time = time.time()
-            result = algo_func(initial_state, n)
-            end_time = time.time()
-            if result:
-                solution, path, total_moves = result
-                num_moves = len(path)
-                results.append((initial_state[0], algo_name, None, end_time - start_time, total_moves, num_moves))
+            else:
+                print(f"Running {algo_name}...")
+            time_taken, result = run_algorithm(initial_state, n, algo_name, heuristic_name)
+            results.append(make_result_row(initial_state, algo_name, heuristic_name, time_taken, result, optimal))
 
 # Saves results of automated data collection in PuzzleData.csv file
 def save_results_to_csv(results, filename="PuzzleData.csv"):
@@ -333,13 +1565,13 @@ def save_results_to_csv(results, filename="PuzzleData.csv"):
             # If the file does not exist, write the header first
             if not file_exists:
                 print("Writing header...")
-                writer.writerow(["Puzzle", "Algorithm", "Heuristic", "Time (seconds)", "Total Moves", "Path Moves"])
+                writer.writerow(["Puzzle", "Algorithm", "Heuristic", "Time (seconds)", "Total Moves", "Path Moves", "Optimal Moves", "Status"])
             
             # Append the results
             for result in results:
-                if len(result) == 6:
-                    start_state, algo, heuristic, time_taken, total_moves, num_moves = result
-                    writer.writerow([start_state, algo, heuristic, time_taken, total_moves, num_moves])
+                if len(result) == 8:
+                    start_state, algo, heuristic, time_taken, total_moves, num_moves, optimal, status = result
+                    writer.writerow([start_state, algo, heuristic, time_taken, total_moves, num_moves, optimal, status])
         print("Results successfully saved.")
     except Exception as e:
         print(f"Error while writing to file: {e}")
@@ -350,6 +1582,8 @@ def save_results_to_csv(results, filename="PuzzleData.csv"):
 if __name__ == "__main__":
     
     results = []  # To store results of each puzzle
+    from solution_cache import default_path, open_cache, save_cache, store_solution, lookup_solution, cached_result
+    solution_cache = open_cache(default_path)  # Optimal solutions from earlier runs
     print("******************************************************************")
     print("\nWelcome to the n-Puzzle Problem solver by Uyi Erhabor & Luz Diaz.")
     print("\n******************************************************************\n")
@@ -365,6 +1599,7 @@ if __name__ == "__main__":
 
     while True:
         if n == 3:
+            from oracle import optimal_length
             # Use hard-coded start states for 3x3 puzzle
             initial_states = {
                 "1": [2, 7, 5, 0, 8, 4, 3, 1, 6],
@@ -373,13 +1608,8 @@ if __name__ == "__main__":
             }
         else:
             # Random start states for larger puzzles
-            initial_states = {}
-            for i in range(1, 4):
-                while True:
-                    state = random.sample(range(n * n), n * n)
-                    if is_solvable(state, n):
-                        initial_states[str(i)] = state
-                        break
+            from generator import random_board
+            initial_states = {str(i): random_board(n) for i in range(1, 4)}
         # Defines the goal state as a 2D tuple where tiles are in sequential order with 0 in the last position
         goal_state = tuple(tuple((i * n + j + 1) % (n * n) for j in range(n)) for i in range(n))
         print("\n******************************************************************\n")
@@ -388,7 +1618,10 @@ if __name__ == "__main__":
         while True:
             print("\nAvailable Puzzles:")
             for key, value in initial_states.items():
-                print(f"{key}: {value}")
+                if n == 3:
+                    print(f"{key}: {value} (optimal: {optimal_length(value)} moves)")
+                else:
+                    print(f"{key}: {value}")
         
             print("4. Random Puzzle")
             print("5. Custom Puzzle")
@@ -396,11 +1629,8 @@ if __name__ == "__main__":
             choice = input("\nEnter your choice: ")
         
             if choice == "4":  # Random start state
-                while True:
-                    initial_state = random.sample(range(n * n), n * n)
-                    if is_solvable(initial_state,n):
-                        initial_state = init_state(initial_state, n)  # Correctly initialize the state
-                        break  # Ensure the random state is solvable
+                from generator import random_board
+                initial_state = init_state(random_board(n), n)  # Made solvable by a parity fix-up
                 break  # Exit the loop with a valid choice
             elif choice == "5": # Custom start state
                 custom_loop = True
@@ -433,16 +1663,26 @@ if __name__ == "__main__":
                             print("The custom puzzle is not solvable. Please try again.")
                 break  # Exit the loop after a valid custom state is provided
             elif choice == "6": # Automated data collection
+                from collect import run_data_collection
                 num_states = int(input("Enter the number of different puzzles to test: "))
-                print("Solving... This may take a while, please be patient.")
-                for i in range(num_states):
-                    while True:
-                        initial_state = random.sample(range(n * n), n * n)
-                        if is_solvable(initial_state,n):
-                            initial_state = init_state(initial_state, n)
-                            break
-                    run_algorithms_on_state(initial_state, n, results, state_number=i+1, total_states=num_states)
-                save_results_to_csv(results)
+                seed = input("Enter a seed for the puzzles, reuse it to resume an interrupted run (press Enter for a random seed): ")
+                seed = int(seed) if seed else random.randrange(10 ** 9)
+                workers = input(f"Enter the number of worker processes (press Enter for {os.cpu_count()}): ")
+                time_limit = input("Enter the time limit per run in seconds (press Enter for no limit): ")
+                memory_limit = input("Enter the memory limit per run in MB (press Enter for no limit): ")
+                binary = input("Also save results to PuzzleData.bin in compact binary format? (y/n): ")
+                print(f"Solving puzzles from seed {seed}... This may take a while, please be patient.")
+                # Rows arrive and are saved in the order the runs finish
+                collection = run_data_collection(num_states, n, seed, int(workers or 0) or None, float(time_limit or 0) or None,
+                                                 int(memory_limit or 0) or None, binary_filename="PuzzleData.bin" if binary.lower() == "y" else None)
+                try:
+                    for number, row in enumerate(collection, 1):
+                        print(f"{number}. {row[1]}{' with ' + row[2] if row[2] else ''} on {row[0]}: {row[7]} in {row[3]:.4f} seconds")
+                except ValueError as e:
+                    # A results file written with other columns
+                    print(e)
+                    exit()
+                print("Results successfully saved to PuzzleData.csv.")
                 exit()  # Exit after collecting and saving the data
             elif choice in initial_states:
                 initial_state = init_state(initial_states[choice], n)
@@ -456,11 +1696,35 @@ if __name__ == "__main__":
             print("2. Breadth-First Search (BFS)")
             print("3. Depth-First Search (DFS)")
             print("4. Iterative Deepening DFS (IDDFS)")
+            print("5. IDA* Search")
+            print("6. Bidirectional BFS")
+            print("7. Memory-bounded A* (SMA*)")
+            print("8. Anytime A* (best solution within a time limit)")
+            print("9. Constructive (fast, not optimal, for large boards)")
+            print("10. Batched A* (needs NumPy, faster on 4x4 and 5x5)")
+            print("11. Beam Search (needs NumPy, fast, not optimal)")
 
         
             algo_choice = input("\nEnter your algorithm choice: ")
-        
-            if algo_choice == "2":
+            if algo_choice in ("10", "11"):
+                from batched_search import np
+                if np is None:
+                    print("The batched searches need NumPy. Install it with \"pip install numpy\" or choose another algorithm.")
+                    continue
+
+            # Every choice but DFS, Anytime A*, Constructive and Beam Search finds a shortest solution, which the cache may already hold
+            use_cache = False
+            if algo_choice in ("1", "2", "4", "5", "6", "7", "10"):
+                cached = cached_result(solution_cache, initial_state, n)
+                if cached:
+                    answer = input(f"\nThe solution cache has an optimal solution for this puzzle ({len(cached[1])} moves). Use it instead of searching? (y/n): ")
+                    use_cache = answer.strip().lower() == "y"
+
+            if use_cache:
+                start_time = time.time()
+                result = cached
+                end_time = time.time()
+            elif algo_choice == "2":
                 print("Solving using BFS. Please wait...")
                 start_time = time.time()
                 result = bfs(initial_state, n)
@@ -470,17 +1734,23 @@ if __name__ == "__main__":
                 start_time = time.time()
                 result = dfs(initial_state, n)
                 end_time = time.time()
-            elif algo_choice == "1":
+            elif algo_choice in ("1", "5", "7", "8", "10", "11"):
                 while True:
                     print("\nSelect a heuristic function:")
                     print("1. Manhattan Distance")
                     print("2. Hamming Distance")
                     print("3. Euclidean Distance")
                     print("4. Chebyshev Distance")
+                    print("5. Linear Conflict (Manhattan + Linear Conflict)")
+                    print("6. Pattern Database (up to 5x5, built once per size and cached on disk)")
+                    print("7. Perfect Oracle (3x3 only)")
+                    print("8. Walking Distance (table built once per size and cached on disk)")
         
                     heuristic_choice = input("\nEnter your heuristic choice: ")
         
-                    if heuristic_choice == "1":
+                    if algo_choice in ("10", "11") and heuristic_choice not in ("1", "5", "6"):
+                        print("The batched searches support Manhattan Distance, Linear Conflict and Pattern Database. Please try again.")
+                    elif heuristic_choice == "1":
                         heuristic = manhattan_distance
                         break
                     elif heuristic_choice == "2":
@@ -492,18 +1762,78 @@ if __name__ == "__main__":
                     elif heuristic_choice == "4":
                         heuristic = chebyshev_distance
                         break
+                    elif heuristic_choice == "5":
+                        heuristic = linear_conflict_distance
+                        break
+                    elif heuristic_choice == "6" and n <= 5:
+                        from pattern_db import pattern_database_distance
+                        heuristic = pattern_database_distance
+                        break
+                    elif heuristic_choice == "7" and n == 3:
+                        from oracle import oracle_distance
+                        heuristic = oracle_distance
+                        break
+                    elif heuristic_choice == "8":
+                        from walking_distance import walking_distance
+                        heuristic = walking_distance
+                        break
                     else:
                         print("Invalid heuristic choice. Please try again.")
             
+                if algo_choice == "7":
+                    while True:
+                        node_budget = input("\nEnter the most search nodes to keep in memory (press Enter for 100000): ")
+                        if not node_budget:
+                            node_budget = 100000
+                            break
+                        if node_budget.isdigit() and int(node_budget) >= 2:
+                            node_budget = int(node_budget)
+                            break
+                        print("Please enter a whole number of at least 2.")
+                elif algo_choice == "8":
+                    while True:
+                        time_limit = input("\nEnter the time limit in seconds (press Enter for 1): ")
+                        try:
+                            time_limit = float(time_limit) if time_limit else 1.0
+                            if time_limit > 0:
+                                break
+                        except ValueError:
+                            pass
+                        print("Please enter a positive number of seconds.")
+                    anytime_stats = {}
+
                 print("Solving. Please wait...")
                 start_time = time.time()
-                result = a_star(initial_state, heuristic, n)
+                if algo_choice == "1":
+                    result = a_star(initial_state, heuristic, n)
+                elif algo_choice == "7":
+                    result = sma_star(initial_state, heuristic, n, node_budget)
+                elif algo_choice == "8":
+                    result = anytime_a_star(initial_state, heuristic, n, time_limit, stats=anytime_stats)
+                elif algo_choice == "10":
+                    from batched_search import batched_a_star
+                    result = batched_a_star(initial_state, heuristic, n)
+                elif algo_choice == "11":
+                    from batched_search import batched_beam_search
+                    result = batched_beam_search(initial_state, heuristic, n)
+                else:
+                    result = ida_star(initial_state, heuristic, n)
                 end_time = time.time()
             elif algo_choice == "4":
                 print("Solving using IDDFS. Please wait...")
                 start_time = time.time()
                 result = iddfs(initial_state, n)
                 end_time = time.time()
+            elif algo_choice == "6":
+                print("Solving using Bidirectional BFS. Please wait...")
+                start_time = time.time()
+                result = bidirectional_bfs(initial_state, n)
+                end_time = time.time()
+            elif algo_choice == "9":
+                print("Solving using the constructive solver. Please wait...")
+                start_time = time.time()
+                result = constructive_solve(initial_state, n)
+                end_time = time.time()
             else:
                 print("Invalid algorithm choice. Please try again.")
                 continue
@@ -511,20 +1841,35 @@ if __name__ == "__main__":
             if result:
                 solution, path, total_moves = result
                 num_moves = len(path)
-                if algo_choice == "1":
-                    heuristic_name = {"1": "Manhattan Distance", "2": "Hamming Distance", "3": "Euclidean Distance", "4": "Chebyshev Distance"}.get(heuristic_choice, "")
-                    print(f"\nPuzzle solved using A* with {heuristic_name} heuristic in about {end_time - start_time:.4f} seconds.")
-                    results.append((f"A* with {heuristic_name}", end_time - start_time, total_moves, num_moves))
+                if use_cache:
+                    print(f"\nPuzzle solved from the solution cache in about {end_time - start_time:.4f} seconds.")
+                    results.append(("Solution Cache", end_time - start_time, total_moves, num_moves))
+                elif algo_choice in ("1", "5", "7", "8", "10", "11"):
+                    algo_name = {"1": "A*", "5": "IDA*", "7": "SMA*", "8": "Anytime A*", "10": "Batched A*", "11": "Beam Search"}[algo_choice]
+                    heuristic_name = {"1": "Manhattan Distance", "2": "Hamming Distance", "3": "Euclidean Distance", "4": "Chebyshev Distance", "5": "Linear Conflict", "6": "Pattern Database", "7": "Perfect Oracle", "8": "Walking Distance"}.get(heuristic_choice, "")
+                    print(f"\nPuzzle solved using {algo_name} with {heuristic_name} heuristic in about {end_time - start_time:.4f} seconds.")
+                    results.append((f"{algo_name} with {heuristic_name}", end_time - start_time, total_moves, num_moves))
                 elif algo_choice == "4":
                     print(f"\nPuzzle solved using IDDFS in about {end_time - start_time:.4f} seconds.")
                     results.append(("IDDFS", end_time - start_time, total_moves, num_moves))
                 else:
-                    algo_name = ["BFS", "DFS"][int(algo_choice) - 2]
+                    algo_name = {"2": "BFS", "3": "DFS", "6": "Bidirectional BFS", "9": "Constructive"}[algo_choice]
                     print(f"\nPuzzle solved using {algo_name} in about {end_time - start_time:.4f} seconds.")
                     results.append((algo_name, end_time - start_time, total_moves, num_moves))
                 
                 print(f"Total moves attempted: {total_moves}")
-                print(f"Actual path moves: {num_moves}")            
+                print(f"Actual path moves: {num_moves}")
+                if algo_choice == "8":
+                    print(f"At most {anytime_stats['bound']:.3f} times the optimal number of moves")
+                if algo_choice in ("1", "2", "4", "5", "6", "7", "10") and not use_cache:
+                    store_solution(solution_cache, [tile for row in initial_state[0] for tile in row], n, [direction for direction, state in path])
+                    save_cache(solution_cache)
+                if n == 3:
+                    print(f"Optimal path moves: {optimal_length(initial_state[0])}")
+                else:
+                    known_moves = lookup_solution(solution_cache, [tile for row in initial_state[0] for tile in row], n)
+                    if known_moves is not None:
+                        print(f"Optimal path moves: {len(known_moves)}")
                 
                 while True:
                     print("\nWhat would you like to do next?")
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import array
+import argparse
+from collections import deque
+
+# Walking distance heuristic. The row pattern of a board counts, for every row, how many of its
+# tiles belong in each goal row, plus the row of the blank. A vertical move changes the row
+# pattern and a horizontal move changes the column pattern (the same thing for columns), so the
+# fewest moves to bring each pattern to the goal, looked up in one table for both, add up to an
+# admissible estimate that also counts tiles blocking each other.
+
+# Folder the table files are written to, shared with the pattern databases
+default_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+
+# Tables already loaded in this process, keyed by n: (pattern ids, distances, transitions)
+loaded_tables = {}
+
+# Name of the file holding the table for n
+def get_table_path(n, directory):
+    return os.path.join(directory, f"wd_{n}x{n}.bin")
+
+# Breadth-first search from the goal pattern over every reachable pattern. A pattern is n*n counts
+# (row by goal row) followed by the blank's row. Returns the patterns in search order, their
+# distances, and the transitions: transitions[(id * 2 + direction) * n + goal row] is the
+# pattern after the blank moves up (direction 0) or down (1) and swaps with a tile whose goal is
+# that row, or -1 if there is no such tile
+def build_table(n):
+    goal = [0] * (n * n + 1)
+    for row in range(n):
+        goal[row * n + row] = n
+    goal[n * n - 1] = n - 1
+    goal[n * n] = n - 1
+    goal = bytes(goal)
+
+    ids = {goal: 0}
+    patterns = [goal]
+    distances = array.array('B', [0])
+    queue = deque([goal])
+    while queue:
+        pattern = queue.popleft()
+        distance = distances[ids[pattern]] + 1
+        blank_row = pattern[n * n]
+        for new_row in (blank_row - 1, blank_row + 1):
+            if not 0 <= new_row < n:
+                continue
+            for goal_row in range(n):
+                if pattern[new_row * n + goal_row] == 0:
+                    continue
+                # The tile moves from new_row into the blank's old row
+                new_pattern = bytearray(pattern)
+                new_pattern[new_row * n + goal_row] -= 1
+                new_pattern[blank_row * n + goal_row] += 1
+                new_pattern[n * n] = new_row
+                new_pattern = bytes(new_pattern)
+                if new_pattern not in ids:
+                    ids[new_pattern] = len(patterns)
+                    patterns.append(new_pattern)
+                    distances.append(distance)
+                    queue.append(new_pattern)
+
+    transitions = array.array('i', [-1]) * (len(patterns) * 2 * n)
+    for pattern_id, pattern in enumerate(patterns):
+        blank_row = pattern[n * n]
+        for direction, new_row in enumerate((blank_row - 1, blank_row + 1)):
+            if not 0 <= new_row < n:
+                continue
+            for goal_row in range(n):
+                if pattern[new_row * n + goal_row]:
+                    new_pattern = bytearray(pattern)
+                    new_pattern[new_row * n + goal_row] -= 1
+                    new_pattern[blank_row * n + goal_row] += 1
+                    new_pattern[n * n] = new_row
+                    transitions[(pattern_id * 2 + direction) * n + goal_row] = ids[bytes(new_pattern)]
+    return patterns, distances, transitions
+
+# Builds and saves the table for n if the file is missing. The file is a JSON header line followed
+# by the patterns, the distances and the transitions (little-endian int32)
+def save_table(n, directory=default_directory):
+    path = get_table_path(n, directory)
+    if os.path.isfile(path):
+        return
+    print(f"Building the {n}x{n} walking distance table. This only happens once...", file=sys.stderr)
+    os.makedirs(directory, exist_ok=True)
+    patterns, distances, transitions = build_table(n)
+    if sys.byteorder != "little":
+        transitions.byteswap()
+    with open(path + ".tmp", "wb") as file:
+        file.write(json.dumps({"n": n, "patterns": len(patterns)}).encode() + b"\n")
+        file.write(b"".join(patterns))
+        file.write(distances.tobytes())
+        file.write(transitions.tobytes())
+    os.replace(path + ".tmp", path)
+
+# Loads the table for n, building it first if needed
+def load_table(n, directory=default_directory):
+    if n not in loaded_tables:
+        save_table(n, directory)
+        with open(get_table_path(n, directory), "rb") as file:
+            count = json.loads(file.readline())["patterns"]
+            size = n * n + 1
+            data = file.read(count * size)
+            ids = {data[i * size:(i + 1) * size]: i for i in range(count)}
+            distances = array.array('B', file.read(count))
+            transitions = array.array('i')
+            transitions.frombytes(file.read())
+            if sys.byteorder != "little":
+                transitions.byteswap()
+        loaded_tables[n] = (ids, distances, transitions)
+    return loaded_tables[n]
+
+# Looks up the row and column pattern ids of a flat board and returns (heuristic, (row id, column id))
+def start_walking_distance(tiles, n):
+    ids, distances, transitions = load_table(n)
+    rows = bytearray(n * n + 1)
+    columns = bytearray(n * n + 1)
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, n)
+        if tile == 0:
+            rows[n * n], columns[n * n] = row, column
+        else:
+            goal_row, goal_column = divmod(tile - 1, n)
+            rows[row * n + goal_row] += 1
+            columns[column * n + goal_column] += 1
+    row_id, column_id = ids[bytes(rows)], ids[bytes(columns)]
+    return distances[row_id] + distances[column_id], (row_id, column_id)
+
+# Updates the pattern ids after the tile at target slides into the blank, in O(1)
+def step_walking_distance(key, tile, blank, target, n):
+    ids, distances, transitions = loaded_tables[n]
+    row_id, column_id = key
+    direction = 0 if target < blank else 1
+    if target % n == blank % n:
+        row_id = transitions[(row_id * 2 + direction) * n + (tile - 1) // n]
+    else:
+        column_id = transitions[(column_id * 2 + direction) * n + (tile - 1) % n]
+    return distances[row_id] + distances[column_id], (row_id, column_id)
+
+# Calculates Walking Distance Heuristic
+def walking_distance(state, goal_positions, n):
+    return start_walking_distance([tile for row in state[0] for tile in row], n)[0]
+
+
+# Offline build step, e.g. "python walking_distance.py 4"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the walking distance table for the n-puzzle.")
+    parser.add_argument("n", type=int, help="size of the puzzle, e.g. 4 for 4x4")
+    parser.add_argument("--directory", default=default_directory, help="folder for the table file")
+    args = parser.parse_args()
+    save_table(args.n, args.directory)
+    ids, distances, transitions = load_table(args.n, args.directory)
+    print(f"Walking distance table for {args.n}x{args.n} is ready: {len(distances)} patterns, at most {max(distances)} moves.")